@@ -0,0 +1,9 @@
+"""Load-testing and benchmark suite for the v1 API.
+
+Run from the repository root::
+
+    python -m benchmarks --posts 5000 --concurrency 8 --save-baseline
+    python -m benchmarks --posts 5000 --concurrency 8 --compare
+
+See `python -m benchmarks --help` for the dataset and run options.
+"""
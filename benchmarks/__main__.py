@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+
+from .environment import BASE_DIR, setup_django
+
+DEFAULT_BASELINE = os.path.join(BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark every route of the v1 API.')
+    dataset = parser.add_argument_group('dataset')
+    dataset.add_argument('--users', type=int, default=50)
+    dataset.add_argument('--groups', type=int, default=5)
+    dataset.add_argument('--posts', type=int, default=1000)
+    dataset.add_argument('--comments', type=int, default=3000)
+    dataset.add_argument('--follows', type=int, default=200)
+    dataset.add_argument('--database',
+                         help='SQLite file to use (a temporary file by '
+                              'default)')
+    run = parser.add_argument_group('run')
+    run.add_argument('--mode', choices=('inprocess', 'wsgi', 'asgi'),
+                     action='append',
+                     help='client mode, may be repeated (default: '
+                          'inprocess and wsgi; asgi needs uvicorn)')
+    run.add_argument('--requests', type=int, default=200,
+                     help='requests per route')
+    run.add_argument('--concurrency', type=int, default=4)
+    baseline = parser.add_argument_group('baseline')
+    baseline.add_argument('--baseline', default=DEFAULT_BASELINE)
+    baseline.add_argument('--save-baseline', action='store_true')
+    baseline.add_argument('--compare', action='store_true',
+                          help='fail when a route regressed against the '
+                               'baseline')
+    baseline.add_argument('--tolerance', type=float, default=0.25,
+                          help='allowed relative slowdown (default: 0.25)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database = setup_django(args.database)
+
+    from . import runner, seed
+
+    samples = seed.seed(users=args.users, groups=args.groups,
+                        posts=args.posts, comments=args.comments,
+                        follows=args.follows)
+    samples['password'] = seed.PASSWORD
+    results = runner.run(samples, args.mode or ['inprocess', 'wsgi'],
+                         args.requests, args.concurrency)
+    print(runner.format_table(results))
+
+    if args.database is None:
+        os.remove(database)
+    if args.save_baseline:
+        runner.save_baseline(args.baseline, results)
+        print(f'Baseline saved to {args.baseline}')
+    if args.compare:
+        regressions = runner.compare(
+            results, runner.load_baseline(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
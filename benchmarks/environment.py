@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BASE_DIR, 'yatube_api')
+
+
+def setup_django(database=None):
+    """Configure Django against a scratch SQLite database and migrate it."""
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+
+    import django
+    from django.conf import settings
+
+    if database is None:
+        handle, database = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+    settings.DATABASES['default']['NAME'] = database
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+    return database
@@ -0,0 +1,108 @@
+"""Compares the encode time and payload size of the API renderers.
+
+Run from the repository root::
+
+    python -m benchmarks.renderers --posts 5000 --repeat 20
+
+Post lists are fetched through the API once, then rendered repeatedly by
+the JSON, MessagePack and CBOR renderers.
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+
+from .environment import setup_django
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.renderers',
+        description='Compare encode time and size of the API renderers.')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--groups', type=int, default=5)
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--database',
+                        help='SQLite file to use (a temporary file by '
+                             'default)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='renders per payload and renderer')
+    return parser.parse_args(argv)
+
+
+def get_renderers():
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import CBORRenderer, MessagePackRenderer
+
+    return [JSONRenderer(), MessagePackRenderer(), CBORRenderer()]
+
+
+def get_payloads():
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    return {
+        'post page (20)': client.get('/api/v1/posts/?cursor=').data,
+        'post list': client.get('/api/v1/posts/').data,
+    }
+
+
+def measure(renderer, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = renderer.render(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'encode_ms': round(statistics.median(timings), 3),
+        'bytes': len(body),
+        'gzip_bytes': len(gzip.compress(body)),
+    }
+
+
+def run(repeat):
+    results = {}
+    for name, data in get_payloads().items():
+        results[name] = {
+            renderer.format: measure(renderer, data, repeat)
+            for renderer in get_renderers()
+        }
+    return results
+
+
+def format_table(results):
+    columns = ('encode_ms', 'bytes', 'gzip_bytes', 'size_vs_json')
+    lines = []
+    for payload, renderers in results.items():
+        lines.append(f'[{payload}]')
+        lines.append('{:<12}'.format('format') + ''.join(
+            f'{column:>14}' for column in columns))
+        json_bytes = renderers['json']['bytes']
+        for name, stats in renderers.items():
+            stats = {**stats,
+                     'size_vs_json': round(stats['bytes'] / json_bytes, 3)}
+            lines.append(f'{name:<12}' + ''.join(
+                f'{stats[column]!s:>14}' for column in columns))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database = setup_django(args.database)
+
+    from . import seed
+
+    seed.seed(users=args.users, groups=args.groups, posts=args.posts,
+              comments=0, follows=0)
+    print(format_table(run(args.repeat)))
+
+    if args.database is None:
+        os.remove(database)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Drives the API routes with concurrent clients and collects statistics.
+
+Clients call the application in process, over HTTP through a local WSGI
+server, or over HTTP through uvicorn serving `yatube_api.asgi`, whose
+async read path answers the hottest anonymous reads; the `asgi` mode
+needs uvicorn installed.
+"""
+import json
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+
+# Routes `api.asgi.ReadPathApplication` answers for anonymous clients.
+ASYNC_READ_ROUTES = (
+    'posts-list', 'posts-detail', 'groups-list', 'comments-list')
+
+
+def get_routes(samples):
+    """Return (name, method, path, data, anonymous) for every route in
+    `api.urls`.
+
+    `samples` holds the seeded objects used for detail routes and the
+    nested comment and user routes. Routes of the async read path are
+    also requested without a token, which is what that path serves.
+    """
+    from api.urls import router
+
+    lookups = {
+        'posts': samples['post'].id,
+        'groups': samples['group'].id,
+        'comments': samples['comment'].id,
+    }
+    kwargs = {
+        'post_id': str(samples['comment'].post_id),
+        'username': samples['user'].username,
+    }
+    routes = []
+    for prefix, viewset, basename in router.registry:
+        path = '/api/v1/' + re.sub(
+            r'\(\?P<(\w+)>[^)]*\)', lambda match: kwargs[match[1]], prefix)
+        if hasattr(viewset, 'list'):
+            routes.append(
+                (f'{basename}-list', 'GET', f'{path}/', None, False))
+        if hasattr(viewset, 'retrieve') and basename in lookups:
+            routes.append((f'{basename}-detail', 'GET',
+                           f'{path}/{lookups[basename]}/', None, False))
+    routes.extend([
+        ('posts-list-limit', 'GET', '/api/v1/posts/?limit=20&offset=100',
+         None, False),
+        ('posts-list-cursor', 'GET', '/api/v1/posts/?cursor=&page_size=20',
+         None, False),
+        ('jwt-create', 'POST', '/api/v1/jwt/create/', {
+            'username': samples['user'].username,
+            'password': samples['password'],
+        }, False),
+    ])
+    routes.extend(
+        (f'{name}-anonymous', method, path, data, True)
+        for name, method, path, data, _ in list(routes)
+        if name in ASYNC_READ_ROUTES
+    )
+    return routes
+
+
+def get_token(user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of `values`."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(share * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(latencies, elapsed, errors):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def count_queries(path, method, data, token=None):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    if token is not None:
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    request = getattr(client, method.lower())
+    request(path, data=data, format='json')
+    with CaptureQueriesContext(connection) as context:
+        request(path, data=data, format='json')
+    return len(context.captured_queries)
+
+
+class InProcessClient:
+    """Calls the Django application through the test client."""
+
+    def __init__(self, token):
+        from rest_framework.test import APIClient
+        self.client = APIClient()
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def request(self, method, path, data, anonymous=False):
+        headers = {} if anonymous else self.headers
+        response = getattr(self.client, method.lower())(
+            path, data=data, format='json', **headers)
+        return response.status_code
+
+    def close(self):
+        from django.db import connections
+        connections.close_all()
+
+
+class HTTPClient:
+    """Calls a local WSGI or ASGI server over HTTP."""
+
+    def __init__(self, token, base_url):
+        import requests
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def request(self, method, path, data, anonymous=False):
+        response = self.session.request(
+            method, self.base_url + path, json=data,
+            headers=None if anonymous else self.headers)
+        return response.status_code
+
+    def close(self):
+        self.session.close()
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_wsgi_server():
+    """Serve the WSGI application, return (shutdown, base URL)."""
+    from django.core.wsgi import get_wsgi_application
+
+    server = make_server('127.0.0.1', 0, get_wsgi_application(),
+                         server_class=ThreadingWSGIServer,
+                         handler_class=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server.shutdown, f'http://127.0.0.1:{server.server_port}'
+
+
+def start_asgi_server():
+    """Serve the ASGI application, return (shutdown, base URL)."""
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit('The asgi mode needs uvicorn: pip install uvicorn')
+    from yatube_api.asgi import application
+
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(
+        application, log_level='warning', lifespan='off', access_log=False))
+    thread = threading.Thread(
+        target=server.run, kwargs={'sockets': [listener]}, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError('uvicorn did not start')
+        time.sleep(0.01)
+
+    def shutdown():
+        server.should_exit = True
+        thread.join()
+        listener.close()
+    return shutdown, f'http://127.0.0.1:{listener.getsockname()[1]}'
+
+
+SERVERS = {'wsgi': start_wsgi_server, 'asgi': start_asgi_server}
+
+
+def drive(make_client, method, path, data, anonymous, requests,
+          concurrency):
+    """Send `requests` requests from `concurrency` clients in parallel."""
+    per_client = [requests // concurrency] * concurrency
+    for index in range(requests % concurrency):
+        per_client[index] += 1
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(count):
+        client = make_client()
+        local = []
+        failed = 0
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                status = client.request(method, path, data, anonymous)
+                local.append(time.perf_counter() - start)
+                if status >= 400:
+                    failed += 1
+        finally:
+            client.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, [count for count in per_client if count]))
+    return summarize(latencies, time.perf_counter() - start, errors[0])
+
+
+def run(samples, modes, requests, concurrency):
+    token = get_token(samples['user'])
+    results = {}
+    for mode in modes:
+        shutdown = None
+        if mode in SERVERS:
+            shutdown, base_url = SERVERS[mode]()
+
+            def make_client():
+                return HTTPClient(token, base_url)
+        else:
+            def make_client():
+                return InProcessClient(token)
+        try:
+            results[mode] = {}
+            for name, method, path, data, anonymous in get_routes(samples):
+                stats = drive(make_client, method, path, data, anonymous,
+                              requests, concurrency)
+                stats['queries'] = count_queries(
+                    path, method, data, None if anonymous else token)
+                results[mode][name] = stats
+        finally:
+            if shutdown is not None:
+                shutdown()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the regressions of `results` against `baseline`."""
+    regressions = []
+    for mode, routes in results.items():
+        for name, stats in routes.items():
+            base = baseline.get(mode, {}).get(name)
+            if base is None:
+                continue
+            if stats['queries'] > base['queries']:
+                regressions.append(
+                    f'{mode} {name}: queries {base["queries"]} -> '
+                    f'{stats["queries"]}')
+            if stats['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+                regressions.append(
+                    f'{mode} {name}: p95 {base["p95_ms"]}ms -> '
+                    f'{stats["p95_ms"]}ms')
+            if stats['rps'] < base['rps'] * (1 - tolerance):
+                regressions.append(
+                    f'{mode} {name}: rps {base["rps"]} -> {stats["rps"]}')
+    return regressions
+
+
+def format_table(results):
+    columns = ('requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms',
+               'queries')
+    lines = []
+    for mode, routes in results.items():
+        lines.append(f'[{mode}]')
+        lines.append('{:<24}'.format('route') + ''.join(
+            f'{column:>10}' for column in columns))
+        for name, stats in routes.items():
+            lines.append(f'{name:<24}' + ''.join(
+                f'{stats[column]!s:>10}' for column in columns))
+    return '\n'.join(lines)
+
+
+def load_baseline(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
@@ -0,0 +1,57 @@
+"""Seeds a benchmark dataset from the builders of the test fixtures."""
+import random
+
+PASSWORD = '1234567'
+
+
+def seed(users=50, groups=5, posts=1000, comments=3000, follows=200,
+         random_seed=0):
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+
+    from posts import counters, feed
+    from posts.models import Comment, Follow, Group, Post, User
+    from tests.fixtures.fixture_data import (build_comment, build_group,
+                                             build_post)
+
+    rng = random.Random(random_seed)
+    password = make_password(PASSWORD)
+    with transaction.atomic():
+        User.objects.bulk_create(
+            User(username=f'TestUser{number}', password=password)
+            for number in range(users)
+        )
+        user_ids = list(User.objects.values_list('id', flat=True))
+        Group.objects.bulk_create(
+            build_group(number, description=f'Описание группы {number}')
+            for number in range(groups)
+        )
+        group_ids = list(Group.objects.values_list('id', flat=True))
+        Post.objects.bulk_create(
+            build_post(number, author_id=rng.choice(user_ids),
+                       group_id=rng.choice(group_ids + [None]))
+            for number in range(posts)
+        )
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        Comment.objects.bulk_create(
+            build_comment(number, author_id=rng.choice(user_ids),
+                          post_id=rng.choice(post_ids))
+            for number in range(comments)
+        )
+        pairs = {
+            tuple(rng.sample(user_ids, 2))
+            for _ in range(min(follows, users * (users - 1)))
+        }
+        Follow.objects.bulk_create(
+            Follow(user_id=user_id, following_id=following_id)
+            for user_id, following_id in pairs
+        )
+        counters.recount()
+        feed.fan_out_posts(Post.objects.only('id', 'author', 'pub_date'))
+
+    return {
+        'user': User.objects.order_by('id').first(),
+        'group': Group.objects.order_by('id').first(),
+        'post': Post.objects.order_by('-comments_count').first(),
+        'comment': Comment.objects.order_by('id').first(),
+    }
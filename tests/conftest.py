@@ -1,6 +1,8 @@
 import sys
 import os
 
+import pytest
+
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(root_dir)
@@ -45,3 +47,17 @@ with open(filename, 'r') as f:
     assert file != default_md, (
         f'Don`t forget to style `{filename}`'
     )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Primary keys are reused between tests, so no cached state may leak."""
+    from django.core.cache import caches
+
+    from api import authentication
+    from posts import follow_graph
+
+    caches['default'].clear()
+    follow_graph.local.clear()
+    authentication.tokens.clear()
+    authentication.users.clear()
@@ -1,52 +1,65 @@
 import pytest
 
 
+# Unsaved objects shaped like the fixtures, shared with `benchmarks.seed`.
+def build_group(number, **fields):
+    from posts.models import Group
+    return Group(title=f'Группа {number}', slug=f'group_{number}', **fields)
+
+
+def build_post(number, **fields):
+    from posts.models import Post
+    return Post(text=f'Тестовый пост {number}', **fields)
+
+
+def build_comment(number, **fields):
+    from posts.models import Comment
+    return Comment(text=f'Коммент {number}', **fields)
+
+
+def create(instance):
+    instance.save()
+    return instance
+
+
 @pytest.fixture
 def group_1():
-    from posts.models import Group
-    return Group.objects.create(title='Группа 1', slug='group_1')
+    return create(build_group(1))
 
 
 @pytest.fixture
 def group_2():
-    from posts.models import Group
-    return Group.objects.create(title='Группа 2', slug='group_2')
+    return create(build_group(2))
 
 
 @pytest.fixture
 def post(user, group_1):
-    from posts.models import Post
-    return Post.objects.create(text='Тестовый пост 1', author=user, group=group_1)
+    return create(build_post(1, author=user, group=group_1))
 
 
 @pytest.fixture
 def post_2(user, group_1):
-    from posts.models import Post
-    return Post.objects.create(text='Тестовый пост 12342341', author=user, group=group_1)
+    return create(build_post(12342341, author=user, group=group_1))
 
 
 @pytest.fixture
 def comment_1_post(post, user):
-    from posts.models import Comment
-    return Comment.objects.create(author=user, post=post, text='Коммент 1')
+    return create(build_comment(1, author=user, post=post))
 
 
 @pytest.fixture
 def comment_2_post(post, another_user):
-    from posts.models import Comment
-    return Comment.objects.create(author=another_user, post=post, text='Коммент 2')
+    return create(build_comment(2, author=another_user, post=post))
 
 
 @pytest.fixture
 def another_post(another_user, group_2):
-    from posts.models import Post
-    return Post.objects.create(text='Тестовый пост 2', author=another_user, group=group_2)
+    return create(build_post(2, author=another_user, group=group_2))
 
 
 @pytest.fixture
 def comment_1_another_post(another_post, user):
-    from posts.models import Comment
-    return Comment.objects.create(author=user, post=another_post, text='Коммент 12')
+    return create(build_comment(12, author=user, post=another_post))
 
 
 @pytest.fixture
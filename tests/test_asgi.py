@@ -0,0 +1,131 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+
+
+FALLBACK_STATUS = 599
+
+
+async def fallback(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': FALLBACK_STATUS, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+def asgi_get(path, query_string=b'', headers=()):
+    status, _, body = asgi_request(path, query_string, headers)
+    return status, body
+
+
+def asgi_request(path, query_string=b'', headers=()):
+    from api.asgi import ReadPathApplication
+
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'query_string': query_string,
+        'headers': list(dict([(b'host', b'testserver'), *headers]).items()),
+    }
+
+    async def call():
+        communicator = ApplicationCommunicator(
+            ReadPathApplication(fallback), scope)
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        body = await communicator.receive_output(5)
+        response_headers = {
+            name.decode(): value.decode() for name, value in start['headers']
+        }
+        return start['status'], response_headers, body['body']
+    return async_to_sync(call)()
+
+
+class TestAsyncReadPath:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_parity(self, client, post, post_2, another_post):
+        status, body = asgi_get('/api/v1/posts/')
+        assert status == 200
+        assert body == client.get('/api/v1/posts/').content, (
+            'Check that the async post list matches the regular response'
+        )
+
+        status, body = asgi_get('/api/v1/posts/', b'limit=1&offset=1')
+        assert json.loads(body) == client.get('/api/v1/posts/?limit=1&offset=1').json()
+
+        status, body = asgi_get(f'/api/v1/posts/{post.id}/')
+        assert json.loads(body) == client.get(f'/api/v1/posts/{post.id}/').json()
+
+        status, body = asgi_get('/api/v1/posts/100500/')
+        assert status == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_groups_and_comments_parity(self, client, post, group_1, comment_1_post, comment_2_post):
+        status, body = asgi_get('/api/v1/groups/')
+        assert json.loads(body) == client.get('/api/v1/groups/').json()
+
+        url = f'/api/v1/posts/{post.id}/comments/'
+        status, body = asgi_get(url)
+        assert status == 200
+        assert json.loads(body) == client.get(url).json()
+
+        status, body = asgi_get('/api/v1/posts/100500/comments/')
+        assert status == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_validators(self, client, post, comment_1_post):
+        for url in (f'/api/v1/posts/{post.id}/', f'/api/v1/posts/{post.id}/comments/'):
+            status, headers, body = asgi_request(url)
+            assert status == 200
+            expected = client.get(url)
+            assert headers['etag'] == expected['ETag'], (
+                'Check that the async path sends the ETag of the regular response'
+            )
+            assert headers['last-modified'] == expected['Last-Modified']
+            response = client.get(url, HTTP_IF_NONE_MATCH=headers['etag'])
+            assert response.status_code == 304
+
+    @pytest.mark.django_db(transaction=True)
+    def test_fallback(self, post):
+        for path, query_string, headers in (
+            ('/api/v1/posts/', b'cursor=', ()),
+            ('/api/v1/posts/', b'', [(b'authorization', b'Bearer token')]),
+            ('/api/v1/follow/', b'', ()),
+            ('/api/v1/posts/', b'', [(b'host', b'evil.example')]),
+        ):
+            status, body = asgi_get(path, query_string, headers)
+            assert status == FALLBACK_STATUS, (
+                f'Check that `{path}?{query_string.decode()}` is handed to the Django application'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_security_headers(self, settings, client, post):
+        settings.SECURE_CONTENT_TYPE_NOSNIFF = True
+        url = f'/api/v1/posts/{post.id}/'
+        status, headers, body = asgi_request(url)
+        expected = client.get(url)
+        for header in ('X-Frame-Options', 'X-Content-Type-Options'):
+            assert headers.get(header.lower()) == expected[header], (
+                f'Check that the async path sends the `{header}` header of the regular response'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_instrumentation(self, post, comment_1_post):
+        from api.instrumentation import registry
+
+        registry.reset()
+        status, headers, body = asgi_request('/api/v1/posts/', b'limit=1')
+        assert status == 200
+        for metric in ('db;', 'serialize;', 'render;', 'total;'):
+            assert metric in headers.get('server-timing', ''), (
+                f'Check that the async path reports `{metric[:-1]}` in the `Server-Timing` header'
+            )
+        histograms = registry.snapshot()['api:posts-list:list']
+        assert histograms['total_ms']['count'] == 1, (
+            'Check that the async path records its timings under the name of the regular view'
+        )
+        assert histograms['queries']['sum'] == 2
+        assert histograms['response_bytes']['sum'] == len(body)
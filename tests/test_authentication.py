@@ -0,0 +1,52 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from api.authentication import get_user_tag
+from api.cache import bump_tags
+from tests.utils import count_queries
+
+User = get_user_model()
+
+
+class TestCachedJWTAuthentication:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_user_cached(self, user_client, follow_1):
+        url = '/api/v1/follow/'
+        first = count_queries(user_client, url)
+        assert count_queries(user_client, url) == first - 1, (
+            'Check that repeated requests with the same token do not load the user again'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_deactivated_user_rejected(self, user_client, user):
+        url = '/api/v1/follow/'
+        assert user_client.get(url).status_code == 200
+
+        user.is_active = False
+        user.save()
+        assert user_client.get(url).status_code == 401, (
+            'Check that a deactivated user is not authenticated from the cache'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_password_change_reloads_user(self, user_client, user):
+        url = '/api/v1/follow/'
+        user_client.get(url)
+        user.set_password('new-password-123')
+        user.save()
+        assert count_queries(user_client, url) == count_queries(user_client, url) + 1, (
+            'Check that saving the user drops it from the authentication cache'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_user_forgotten_in_other_processes(self, user_client, user):
+        url = '/api/v1/follow/'
+        assert user_client.get(url).status_code == 200
+
+        # Another process deactivated the user and bumped its version.
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        bump_tags(get_user_tag(user.pk))
+        assert user_client.get(url).status_code == 401, (
+            'Check that cached users are checked against the shared version'
+        )
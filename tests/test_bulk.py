@@ -0,0 +1,67 @@
+import pytest
+
+from posts.models import Comment, Post
+
+
+class TestBulkCreate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_create(self, user_client, user, group_1):
+        data = [
+            {'text': f'Пост {number}', 'group': group_1.id}
+            for number in range(3)
+        ]
+        response = user_client.post('/api/v1/posts/', data=data, format='json')
+        assert response.status_code == 201, (
+            'Check that a POST request to `/api/v1/posts/` with a JSON array returns status 201'
+        )
+        test_data = response.json()
+        assert [item['text'] for item in test_data] == [item['text'] for item in data]
+        assert all(item['author'] == user.username for item in test_data)
+        assert [item['id'] for item in test_data] == list(
+            Post.objects.order_by('id').values_list('id', flat=True)
+        ), 'Check that bulk created posts are returned with their ids'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_create_errors_by_index(self, user_client):
+        data = [{'text': 'Пост'}, {}, {'text': 'Пост', 'group': 100500}]
+        response = user_client.post('/api/v1/posts/', data=data, format='json')
+        assert response.status_code == 400
+        assert set(response.json()) == {'1', '2'}, (
+            'Check that bulk create reports errors by the index of the item'
+        )
+        assert not Post.objects.exists(), (
+            'Check that nothing is created when any item of the batch is invalid'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_create_max_batch_size(self, settings, user_client):
+        settings.API_BULK_MAX_BATCH_SIZE = 2
+        data = [{'text': 'Пост'}] * 3
+        response = user_client.post('/api/v1/posts/', data=data, format='json')
+        assert response.status_code == 400
+        assert not Post.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_bulk_create(self, user_client, post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        data = [{'text': f'Коммент {number}', 'post': post.id} for number in range(2)]
+        response = user_client.post(url, data=data, format='json')
+        assert response.status_code == 201
+        assert Comment.objects.filter(post=post).count() == 2
+        post.refresh_from_db()
+        assert post.comments_count == 2, (
+            'Check that bulk created comments update `comments_count`'
+        )
+        assert len(user_client.get(url).json()) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_bulk_create_missing_post(self, user_client):
+        url = '/api/v1/posts/999999/comments/'
+        for data in ([{'text': 'Коммент'}], [{'text': 'Коммент'}, {'text': ''}]):
+            response = user_client.post(url, data=data, format='json')
+            assert response.status_code == 404, (
+                'Check that comments for a missing post get 404, even with invalid items'
+            )
+        response = user_client.post(url, data={'text': ''}, format='json')
+        assert response.status_code == 404
@@ -0,0 +1,49 @@
+import pytest
+
+from posts.models import Comment
+from tests.utils import count_queries
+
+
+class TestResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_retrieve_cached(self, client, post):
+        url = f'/api/v1/posts/{post.id}/'
+        count_queries(client, url)
+        assert count_queries(client, url) == 0, (
+            f'Check that a repeated GET request to `{url}` is served from the cache'
+        )
+
+        post.text = 'Новый текст'
+        post.save()
+        assert client.get(url).json()['text'] == post.text, (
+            f'Check that saving a post invalidates the cached `{url}`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_invalidated(self, client, post, comment_1_post, another_user):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        assert len(client.get(url).json()) == 1
+        Comment.objects.create(author=another_user, post=post, text='Коммент')
+        assert len(client.get(url).json()) == 2, (
+            f'Check that creating a comment invalidates the cached `{url}`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_groups_etag(self, client, group_1):
+        url = '/api/v1/groups/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag, f'Check that a GET request to `{url}` returns an ETag'
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304 and not response.content, (
+            f'Check that `{url}` returns 304 without a body for a matching `If-None-Match`'
+        )
+
+        group_1.title = 'Новое название'
+        group_1.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            f'Check that changing a group invalidates the ETag of `{url}`'
+        )
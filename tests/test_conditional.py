@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from posts.models import Post
+
+
+def later(moment, seconds=0):
+    return http_date((moment + datetime.timedelta(seconds=seconds)).timestamp())
+
+
+class TestConditionalRequests:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_last_modified(self, client, post):
+        url = f'/api/v1/posts/{post.id}/'
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response['Last-Modified'] == later(post.updated), (
+            'Check that the post detail reports its Last-Modified time'
+        )
+
+        client.get(url, HTTP_IF_NONE_MATCH='W/"other"')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_MODIFIED_SINCE=later(post.updated, 1))
+        assert response.status_code == 304, (
+            'Check that an unchanged post answers If-Modified-Since with 304'
+        )
+        assert response.content == b''
+        assert len(context.captured_queries) == 0, (
+            'Check that a cached post answers If-Modified-Since without queries'
+        )
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=later(post.updated, -60))
+        assert response.status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_last_modified(self, user_client, post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        yesterday = post.updated - datetime.timedelta(days=1)
+        Post.objects.filter(pk=post.pk).update(updated=yesterday)
+        since = later(yesterday, 1)
+        assert user_client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code == 304
+
+        response = user_client.post(url, {'text': 'Новый', 'post': post.id})
+        assert response.status_code == 201
+        response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200, (
+            'Check that comment lists are served again after a new comment'
+        )
+        assert len(response.json()) == 1
+
+        comment_id = response.json()[0]['id']
+        Post.objects.filter(pk=post.pk).update(updated=yesterday)
+        user_client.patch(f'{url}{comment_id}/', {'text': 'Исправлен'})
+        assert user_client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code == 200, (
+            'Check that editing a comment moves the `updated` time of the post'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_etag_takes_precedence(self, client, post):
+        url = f'/api/v1/posts/{post.id}/'
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH='W/"other"',
+                              HTTP_IF_MODIFIED_SINCE=later(post.updated, 1))
+        assert response.status_code == 200
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
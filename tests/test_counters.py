@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import call_command
+
+from posts.models import Comment, Follow, Post, Profile
+
+
+class TestCounters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_count(self, user_client, post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        comment_id = user_client.post(url, data={'text': 'Коммент', 'post': post.id}).json()['id']
+        user_client.post(url, data={'text': 'Коммент 2', 'post': post.id})
+
+        response = user_client.get(f'/api/v1/posts/{post.id}/')
+        assert response.json().get('comments_count') == 2, (
+            'Check that the Post serializer returns `comments_count`, '
+            'increased when a comment is created'
+        )
+
+        user_client.delete(f'{url}{comment_id}/')
+        post.refresh_from_db()
+        assert post.comments_count == 1, (
+            'Check that deleting a comment decreases `comments_count`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_counts(self, user_client, user, another_user):
+        user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        assert Profile.objects.get(user=another_user).followers_count == 1
+        assert Profile.objects.get(user=user).following_count == 1
+
+        user_client.delete(f'/api/v1/follow/{another_user.username}/')
+        assert Profile.objects.get(user=another_user).followers_count == 0
+        assert Profile.objects.get(user=user).following_count == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_recount_repairs_drift(self, post, comment_1_post, comment_2_post,
+                                   user, another_user):
+        Follow.objects.create(user=user, following=another_user)
+        Profile.objects.filter(user=user).delete()
+        Post.objects.filter(pk=post.pk).update(comments_count=7)
+
+        call_command('recount')
+
+        post.refresh_from_db()
+        assert post.comments_count == Comment.objects.filter(post=post).count()
+        assert Profile.objects.get(user=user).following_count == 1
+        assert Profile.objects.get(user=another_user).followers_count == 1
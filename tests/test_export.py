@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+
+class TestNDJSONExport:
+
+    @staticmethod
+    def read_lines(response):
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert response.streaming, 'Check that the NDJSON export is streamed'
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_export(self, client, post, post_2, another_post):
+        expected = client.get('/api/v1/posts/').json()
+        response = client.get('/api/v1/posts/?format=ndjson')
+        assert self.read_lines(response) == expected, (
+            'Check that `/api/v1/posts/?format=ndjson` streams the posts '
+            'in the shape of the regular list'
+        )
+
+        response = client.get('/api/v1/posts/', HTTP_ACCEPT='application/x-ndjson')
+        assert self.read_lines(response) == expected
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_export(self, client, post, comment_1_post, comment_2_post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        expected = client.get(url).json()
+        response = client.get(f'{url}?format=ndjson')
+        assert self.read_lines(response) == expected
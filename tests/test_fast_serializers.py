@@ -0,0 +1,51 @@
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from posts.models import Post
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+class TestFastSerializers:
+
+    @staticmethod
+    def assert_parity(settings, client, url):
+        settings.API_FAST_LIST_SERIALIZERS = False
+        regular = client.get(url)
+        settings.API_FAST_LIST_SERIALIZERS = True
+        cache.clear()
+        fast = client.get(url)
+        assert regular.status_code == fast.status_code == 200
+        assert fast.content == regular.content, (
+            f'Check that the fast serializers render `{url}` byte for byte '
+            'like the regular serializers'
+        )
+        return fast.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_parity(self, settings, tmp_path, client, post, another_post, user):
+        settings.MEDIA_ROOT = str(tmp_path)
+        Post.objects.create(
+            text='Пост с картинкой', author=user,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, content_type='image/gif')
+        )
+        test_data = self.assert_parity(settings, client, '/api/v1/posts/')
+        assert test_data[0]['author'] == post.author.username
+        assert test_data[0]['group'] == post.group_id
+        assert test_data[-1]['image'].startswith('http://testserver/')
+
+        self.assert_parity(settings, client, '/api/v1/posts/?limit=2&offset=1')
+        self.assert_parity(settings, client, '/api/v1/posts/?cursor=&page_size=2')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_parity(self, settings, client, post, comment_1_post, comment_2_post):
+        test_data = self.assert_parity(
+            settings, client, f'/api/v1/posts/{post.id}/comments/')
+        assert [item['id'] for item in test_data] == [comment_1_post.id, comment_2_post.id]
+        assert test_data[1]['author'] == comment_2_post.author.username
+        assert test_data[1]['post'] == post.id
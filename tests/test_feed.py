@@ -0,0 +1,97 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from posts.feed import fan_out_posts
+from posts.models import FeedEntry, Follow, Post
+
+
+class TestFeedAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_not_auth(self, client):
+        response = client.get('/api/v1/feed/')
+        assert response.status_code == 401, (
+            'Check that `/api/v1/feed/` on a GET request without a token returns status 401'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_fan_out_on_write(self, user_client, user, another_user, user_2):
+        response = user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        assert response.status_code == 201
+
+        author_client = APIClient()
+        author_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(another_user).access_token}'
+        )
+        for number in range(3):
+            author_client.post('/api/v1/posts/', data={'text': f'Пост {number}'})
+        Post.objects.create(text='Чужой пост', author=user_2)
+
+        assert FeedEntry.objects.filter(user=user).count() == 3, (
+            'Check that a new post is fanned out to the timelines of the author`s followers'
+        )
+        response = user_client.get('/api/v1/feed/?page_size=2')
+        assert response.status_code == 200
+        test_data = response.json()
+        expected = list(
+            Post.objects.filter(author=another_user)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+        assert [item['id'] for item in test_data['results']] == expected[:2], (
+            'Check that `/api/v1/feed/` returns posts of followed authors, newest first'
+        )
+        test_data = user_client.get(test_data['next']).json()
+        assert [item['id'] for item in test_data['results']] == expected[2:]
+        assert test_data['next'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_backfill_and_unfollow(self, user_client, user, another_user, another_post):
+        user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        test_data = user_client.get('/api/v1/feed/').json()
+        assert [item['id'] for item in test_data['results']] == [another_post.id], (
+            'Check that following an author backfills the feed with the author`s posts'
+        )
+
+        response = user_client.delete(f'/api/v1/follow/{another_user.username}/')
+        assert response.status_code == 204, (
+            'Check that a DELETE request to `/api/v1/follow/{username}/` returns status 204'
+        )
+        assert not Follow.objects.filter(user=user, following=another_user).exists()
+        assert user_client.get('/api/v1/feed/').json()['results'] == [], (
+            'Check that unfollowing an author removes the author`s posts from the feed'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_fan_out_on_read(self, settings, user_client, user, another_user):
+        settings.FEED_FANOUT_LIMIT = 1
+        user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        post = Post.objects.create(text='Пост', author=another_user)
+        fan_out_posts([post])
+
+        assert not FeedEntry.objects.exists(), (
+            'Check that posts of popular authors are not fanned out on write'
+        )
+        test_data = user_client.get('/api/v1/feed/').json()
+        assert [item['id'] for item in test_data['results']] == [post.id], (
+            'Check that posts of popular authors are merged into the feed on read'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_author_drops_below_limit(self, settings, user_client, user, user_2, another_user):
+        settings.FEED_FANOUT_LIMIT = 2
+        user_2_client = APIClient()
+        user_2_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user_2).access_token}'
+        )
+        user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        user_2_client.post('/api/v1/follow/', data={'following': another_user.username})
+        post = Post.objects.create(text='while popular', author=another_user)
+        fan_out_posts([post])
+        assert [item['id'] for item in user_client.get('/api/v1/feed/').json()['results']] == [post.id]
+
+        user_2_client.delete(f'/api/v1/follow/{another_user.username}/')
+        assert [item['id'] for item in user_client.get('/api/v1/feed/').json()['results']] == [post.id], (
+            'Check that posts published while the author was over the fan-out '
+            'limit stay in the feed once the author drops below it'
+        )
@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from posts.models import Post
+
+
+def get_ids(response):
+    return [item['id'] for item in response.json()]
+
+
+class TestPostFilter:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_filter_by_group_and_author(self, client, post, post_2, another_post):
+        response = client.get('/api/v1/posts/?group=group_1')
+        assert response.status_code == 200
+        assert get_ids(response) == [post_2.id, post.id], (
+            'Check that `?group=<slug>` returns posts of that group only'
+        )
+        response = client.get('/api/v1/posts/?author=TestUserAnother')
+        assert get_ids(response) == [another_post.id], (
+            'Check that `?author=<username>` returns posts of that author only'
+        )
+        response = client.get('/api/v1/posts/?group=group_2&author=TestUser')
+        assert response.json() == []
+        response = client.get('/api/v1/posts/?group=missing')
+        assert response.json() == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_filter_by_date(self, client, post, post_2, another_post):
+        now = timezone.now()
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=now - datetime.timedelta(days=10))
+        Post.objects.filter(pk=post_2.pk).update(
+            pub_date=now - datetime.timedelta(days=5))
+
+        since = (now - datetime.timedelta(days=7)).date().isoformat()
+        response = client.get(f'/api/v1/posts/?since={since}')
+        assert get_ids(response) == [another_post.id, post_2.id], (
+            'Check that `?since=` keeps posts published on or after the date'
+        )
+        until = (now - datetime.timedelta(days=5)).isoformat()
+        response = client.get('/api/v1/posts/', {'until': until})
+        assert get_ids(response) == [post.id], (
+            'Check that `?until=` keeps posts published before the moment'
+        )
+        response = client.get(
+            '/api/v1/posts/', {'since': since, 'until': until, 'limit': 5})
+        assert response.json()['count'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_filtered_posts_newest_first(self, client, post, post_2, another_post):
+        now = timezone.now()
+        Post.objects.filter(pk=post.pk).update(pub_date=now)
+        Post.objects.filter(pk=post_2.pk).update(
+            pub_date=now - datetime.timedelta(days=2))
+        Post.objects.filter(pk=another_post.pk).update(
+            pub_date=now - datetime.timedelta(days=1))
+
+        since = (now - datetime.timedelta(days=3)).isoformat()
+        response = client.get('/api/v1/posts/', {'since': since})
+        assert get_ids(response) == [post.id, another_post.id, post_2.id], (
+            'Check that filtered posts are ordered by publication date, newest first'
+        )
+        pages = [
+            client.get('/api/v1/posts/', {'since': since, 'limit': 1, 'offset': offset}).json()
+            for offset in range(3)
+        ]
+        assert [page['results'][0]['id'] for page in pages] == [post.id, another_post.id, post_2.id], (
+            'Check that limit/offset pages of filtered posts follow the same order'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_filter_invalid_date(self, client, post):
+        response = client.get('/api/v1/posts/?since=yesterday')
+        assert response.status_code == 400, (
+            'Check that an invalid `?since=` returns status 400'
+        )
+        assert 'since' in response.json()
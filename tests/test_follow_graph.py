@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from posts import follow_graph
+from posts.models import Follow
+
+
+class TestFollowGraph:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_lookups_are_cached_and_invalidated(self, user, user_2, another_user):
+        Follow.objects.create(user=user, following=another_user)
+        assert follow_graph.get_following(user.pk) == {another_user.pk}
+        with CaptureQueriesContext(connection) as context:
+            assert follow_graph.following_many(
+                user.pk, [another_user.pk, user_2.pk]
+            ) == {another_user.pk: True, user_2.pk: False}
+        assert not context.captured_queries, (
+            'Check that cached follow lookups do not query the database'
+        )
+
+        follow_graph.local.clear()
+        with CaptureQueriesContext(connection) as context:
+            assert follow_graph.is_following(user.pk, another_user.pk)
+        assert not context.captured_queries, (
+            'Check that the follows are read back from the shared cache'
+        )
+
+        Follow.objects.create(user=user, following=user_2)
+        assert follow_graph.is_following(user.pk, user_2.pk), (
+            'Check that following an author invalidates the cached follows'
+        )
+        Follow.objects.filter(user=user, following=user_2).delete()
+        assert not follow_graph.is_following(user.pk, user_2.pk)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_is_following(self, settings, user_client, client, post, another_post, another_user):
+        response = user_client.post('/api/v1/follow/', {'following': another_user.username})
+        assert response.status_code == 201
+
+        flags = {item['id']: item['is_following']
+                 for item in user_client.get('/api/v1/posts/').json()}
+        assert flags == {post.id: False, another_post.id: True}, (
+            'Check that posts tell whether the user follows their author'
+        )
+        settings.API_FAST_LIST_SERIALIZERS = True
+        fast = {item['id']: item['is_following']
+                for item in user_client.get('/api/v1/posts/').json()}
+        assert fast == flags
+        assert client.get(f'/api/v1/posts/{another_post.id}/').json()['is_following'] is False
+
+        assert user_client.get(f'/api/v1/posts/{another_post.id}/').json()['is_following']
+        user_client.delete(f'/api/v1/follow/{another_user.username}/')
+        assert not user_client.get(f'/api/v1/posts/{another_post.id}/').json()['is_following'], (
+            'Check that cached posts are refreshed after unfollowing'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_ignores_stale_graph(self, user_client, user, another_user):
+        Follow.objects.create(user=user, following=another_user)
+        follow_graph.get_following(user.pk)
+        response = user_client.post('/api/v1/follow/', {'following': another_user.username})
+        assert response.status_code == 400, (
+            'Check that duplicate follows are still rejected'
+        )
+
+        # Another process unfollowed without this one seeing the bump.
+        Follow.objects.filter(user=user).delete()
+        follow_graph.local.set(user.pk, follow_graph.get_version(user.pk),
+                               frozenset({another_user.pk}))
+        response = user_client.post('/api/v1/follow/', {'following': another_user.username})
+        assert response.status_code == 201, (
+            'Check that a stale follow graph does not reject a follow'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_local_copies_expire(self, settings, user, another_user):
+        settings.FOLLOW_GRAPH_LOCAL_TTL = 0
+        follow_graph.get_following(user.pk)
+        Follow.objects.bulk_create([Follow(user=user, following=another_user)])
+        assert follow_graph.get_following(user.pk) == {another_user.pk}, (
+            'Check that in-process copies expire without a version bump'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_is_following_with_if_modified_since(self, user_client, another_post, another_user):
+        url = f'/api/v1/posts/{another_post.id}/'
+        response = user_client.get(url)
+        assert 'Last-Modified' not in response, (
+            'Check that responses to users are not validated by modification time'
+        )
+        user_client.post('/api/v1/follow/', {'following': another_user.username})
+        response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=http_date())
+        assert response.status_code == 200
+        assert response.json()['is_following'] is True
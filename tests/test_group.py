@@ -1,8 +1,21 @@
+import datetime
+
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.fields import DateTimeField
 
+from api.views import GroupViewSet
 from posts.models import Group
 
 
+def as_json(value):
+    if isinstance(value, datetime.datetime):
+        return DateTimeField().to_representation(value)
+    return value
+
+
 class TestGroupAPI:
 
     @pytest.mark.django_db(transaction=True)
@@ -95,7 +108,7 @@ class TestGroupAPI:
         g = Group.objects.filter(id=group_2.id)
         json_response = response.json()
         for k in json_response:
-            assert k in g.values()[0] and json_response[k] == g.values()[0][k], (
+            assert k in g.values()[0] and json_response[k] == as_json(g.values()[0][k]), (
                 'Check that on GET request to `/api/v1/groups/{id}/` '
                 'returns information about the corresponding community'
             )
@@ -107,7 +120,73 @@ class TestGroupAPI:
         g = Group.objects.filter(id=group_1.id)
         json_response = response.json()
         for k in json_response:
-            assert k in g.values()[0] and json_response[k] == g.values()[0][k], (
+            assert k in g.values()[0] and json_response[k] == as_json(g.values()[0][k]), (
                 'Check that on GET request to `/api/v1/groups/{id}/` '
                 'returns information about the corresponding community'
             )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_stats(self, user_client, group_1, group_2):
+        url = '/api/v1/posts/'
+        first = user_client.post(url, data={'text': 'First', 'group': group_1.id}).json()
+        second = user_client.post(url, data={'text': 'Second', 'group': group_1.id}).json()
+        user_client.post(url, data={'text': 'Third', 'group': group_2.id})
+
+        response = user_client.get(f'/api/v1/groups/{group_1.id}/')
+        assert response.json()['posts_count'] == 2, (
+            'Check that creating a post counts it in its group'
+        )
+        assert response.json()['last_post_at'] == second['pub_date'], (
+            'Check that `last_post_at` is the date of the latest post of the group'
+        )
+
+        user_client.delete(f"{url}{second['id']}/")
+        group = Group.objects.get(id=group_1.id)
+        assert group.posts_count == 1
+        assert as_json(group.last_post_at) == first['pub_date'], (
+            'Check that deleting the latest post moves `last_post_at` back'
+        )
+
+        user_client.patch(f"{url}{first['id']}/", data={'group': group_2.id})
+        assert user_client.get(f'/api/v1/groups/{group_1.id}/').json()['posts_count'] == 0, (
+            'Check that moving a post to another group updates the cached stats'
+        )
+        assert user_client.get(f'/api/v1/groups/{group_1.id}/').json()['last_post_at'] is None
+        assert Group.objects.get(id=group_2.id).posts_count == 2
+
+        Group.objects.filter(id=group_2.id).update(posts_count=9, last_post_at=None)
+        call_command('recount')
+        assert Group.objects.get(id=group_2.id).posts_count == 2, (
+            'Check that recount repairs the stats of groups'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_catalog_cache(self, client, user_client, group_1, group_2):
+        response = client.get('/api/v1/groups/', {'ordering': '-last_post_at'})
+        assert response.status_code == 200
+
+        user_client.post('/api/v1/posts/', data={'text': 'Post', 'group': group_2.id})
+        response = client.get('/api/v1/groups/', {'ordering': '-last_post_at'})
+        assert [item['id'] for item in response.json()] == [group_2.id, group_1.id], (
+            'Check that groups can be ordered by activity and that a new post '
+            'invalidates the cached catalog'
+        )
+
+        user_client.post('/api/v1/posts/', data={'text': 'No group'})
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/groups/', {'ordering': '-last_post_at'})
+        assert not context.captured_queries, (
+            'Check that posts outside any group keep the catalog cached'
+        )
+
+    def test_group_catalog_timeout(self, settings):
+        settings.API_CACHE_TIMEOUT = 300
+        settings.API_GROUP_CACHE_TIMEOUT = 86400
+        assert GroupViewSet().get_cache_timeout() == 300, (
+            'Check that a process-local cache keeps the regular timeout'
+        )
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                       'LOCATION': 'api_cache'}}
+        assert GroupViewSet().get_cache_timeout() == 86400, (
+            'Check that a shared cache keeps the catalog for long'
+        )
@@ -0,0 +1,141 @@
+import io
+import os
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+from posts import images
+from posts.models import Post
+
+
+def make_image(name='image.png', size=(800, 600), color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.POST_IMAGE_PROCESSING_SYNC = True
+    settings.POST_IMAGE_VARIANTS = {
+        'thumbnail': {'size': (320, 320), 'format': 'JPEG'},
+        'small': {'size': (100, 100), 'format': 'PNG'},
+    }
+    return tmp_path
+
+
+class TestPostImages:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_variants_are_rendered(self, user_client, media):
+        response = user_client.post(
+            '/api/v1/posts/', {'text': 'С картинкой', 'image': make_image()},
+            format='multipart')
+        assert response.status_code == 201
+        post = Post.objects.get()
+
+        response = user_client.get(f'/api/v1/posts/{post.id}/')
+        variants = response.json()['image_variants']
+        assert set(variants) == {'thumbnail', 'small'}, (
+            'Check that the post exposes the URLs of its image variants'
+        )
+        assert variants['thumbnail'].startswith('http://testserver/media/posts/')
+        assert variants['thumbnail'].endswith('.jpg')
+
+        stored = media / variants['thumbnail'].split('/media/')[1]
+        with Image.open(stored) as thumbnail:
+            assert thumbnail.size == (320, 240)
+            assert thumbnail.format == 'JPEG'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_variants_in_fast_list(self, user_client, media, settings):
+        user_client.post(
+            '/api/v1/posts/', {'text': 'С картинкой', 'image': make_image()},
+            format='multipart')
+        Post.objects.create(text='Без картинки', author=Post.objects.get().author)
+        regular = user_client.get('/api/v1/posts/').json()
+        settings.API_FAST_LIST_SERIALIZERS = True
+        assert user_client.get('/api/v1/posts/').json() == regular, (
+            'Check that the fast list path renders image variants the same way'
+        )
+        assert regular[1]['image_variants'] == {}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_variants_are_replaced_and_deleted(self, user_client, media):
+        user_client.post(
+            '/api/v1/posts/', {'text': 'С картинкой', 'image': make_image()},
+            format='multipart')
+        post = Post.objects.get()
+        old_files = {
+            url.split('/media/')[1]
+            for url in user_client.get(f'/api/v1/posts/{post.id}/').json()['image_variants'].values()
+        }
+
+        response = user_client.patch(
+            f'/api/v1/posts/{post.id}/', {'image': make_image('new.png', color='blue')},
+            format='multipart')
+        assert response.status_code == 200
+        new_files = {
+            url.split('/media/')[1]
+            for url in user_client.get(f'/api/v1/posts/{post.id}/').json()['image_variants'].values()
+        }
+        assert len(new_files) == 2 and not new_files & old_files
+        assert not any(os.path.exists(media / name) for name in old_files), (
+            'Check that variants of a replaced image are deleted'
+        )
+
+        user_client.delete(f'/api/v1/posts/{post.id}/')
+        assert not any(os.path.exists(media / name) for name in new_files), (
+            'Check that variants are deleted with the post'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_variants_move_last_modified(self, user, media):
+        post = Post.objects.create(text='Пост', author=user, image=make_image())
+        Post.objects.filter(pk=post.pk).update(
+            updated=timezone.now() - timedelta(days=1))
+        images.store_variants(post.id, post.image.name, {'small': ('png', b'png')})
+        post.refresh_from_db()
+        assert post.image_variants
+        assert post.updated > timezone.now() - timedelta(minutes=1), (
+            'Check that storing variants moves the Last-Modified time of the post'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_variants_are_rendered_in_pool(self, user, media, settings):
+        settings.POST_IMAGE_PROCESSING_SYNC = False
+        ready = threading.Event()
+
+        def receiver(post_id, **kwargs):
+            ready.set()
+        images.variants_ready.connect(receiver, weak=False)
+        try:
+            post = Post.objects.create(text='Пост', author=user, image=make_image())
+            images.process_image(post.id, post.image.name)
+            assert ready.wait(60), (
+                'Check that the variants rendered by the process pool are stored'
+            )
+        finally:
+            images.variants_ready.disconnect(receiver)
+        post.refresh_from_db()
+        assert set(images.load_variants(post.image_variants)) == {'thumbnail', 'small'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_render_failure_is_logged(self, user, media, settings, caplog):
+        settings.POST_IMAGE_PROCESSING_SYNC = False
+        post = Post.objects.create(text='Пост', author=user, image=make_image())
+        os.remove(post.image.path)
+        images.process_image(post.id, post.image.name)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline and not caplog.records:
+            time.sleep(0.05)
+        assert any(
+            record.name == 'posts.images' and str(post.id) in record.getMessage()
+            for record in caplog.records
+        ), 'Check that a failed rendering is logged with the id of the post'
@@ -0,0 +1,57 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.instrumentation import registry
+
+
+class TestInstrumentation:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_server_timing(self, client, post):
+        response = client.get('/api/v1/posts/')
+        header = response.get('Server-Timing', '')
+        for metric in ('db;', 'app;', 'serialize;', 'render;', 'total;'):
+            assert metric in header, (
+                f'Check that the `Server-Timing` header reports `{metric[:-1]}`'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_metrics_admin_only(self, client, user_client, django_user_model, post):
+        client.get('/api/v1/posts/')
+        assert user_client.get('/api/v1/metrics/').status_code == 403, (
+            'Check that `/api/v1/metrics/` is not available to regular users'
+        )
+
+        admin = django_user_model.objects.create_user(
+            username='Admin', password='1234567', is_staff=True)
+        admin_client = APIClient()
+        admin_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}'
+        )
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        test_data = response.json()
+        assert 'api:posts-list:list' in test_data, (
+            'Check that `/api/v1/metrics/` reports histograms per view and action'
+        )
+        histograms = test_data['api:posts-list:list']
+        assert histograms['total_ms']['count'] >= 1
+        assert set(histograms) >= {'db_ms', 'app_ms', 'serialize_ms', 'render_ms', 'queries', 'response_bytes'}
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('url, fast', [
+        ('/api/v1/posts/', False),
+        ('/api/v1/posts/', True),
+        ('/api/v1/posts/?format=ndjson', False),
+    ])
+    def test_serialize_metric(self, settings, client, post, another_post, url, fast):
+        settings.API_FAST_LIST_SERIALIZERS = fast
+        registry.reset()
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        histogram = registry.snapshot()['api:posts-list:list']['serialize_ms']
+        assert histogram['count'] == 1 and histogram['sum'] > 0, (
+            'Check that the serializer time of every list path is recorded'
+        )
@@ -0,0 +1,68 @@
+import pytest
+
+from posts.models import Comment, Post
+
+
+class TestKeysetPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_cursor_pages(self, client, user):
+        posts = [
+            Post.objects.create(text=f'Пост {number}', author=user)
+            for number in range(5)
+        ]
+        expected = [post.id for post in reversed(posts)]
+
+        url = '/api/v1/posts/?cursor=&page_size=2'
+        received = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Check that a GET request to `{url}` returns status 200'
+            )
+            test_data = response.json()
+            assert set(test_data) == {'next', 'results'}, (
+                'Check that a cursor page has `next` and `results` keys'
+            )
+            assert len(test_data['results']) <= 2, (
+                'Check that `page_size` limits the size of a cursor page'
+            )
+            received.extend(item['id'] for item in test_data['results'])
+            url = test_data['next']
+
+        assert received == expected, (
+            'Check that cursor pages return every post once, newest first'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_limit_takes_precedence(self, client, post, post_2):
+        response = client.get('/api/v1/posts/?limit=1&cursor=')
+        test_data = response.json()
+        assert 'count' in test_data and len(test_data['results']) == 1, (
+            'Check that requests with `limit` keep limit/offset pagination'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_invalid_cursor(self, client, post):
+        response = client.get('/api/v1/posts/?cursor=broken')
+        assert response.status_code == 404, (
+            'Check that an invalid cursor returns status 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_cursor_pages(self, client, user, post):
+        comments = [
+            Comment.objects.create(text=f'Коммент {number}', author=user, post=post)
+            for number in range(5)
+        ]
+        url = f'/api/v1/posts/{post.id}/comments/?cursor=&page_size=2'
+        received = []
+        while url:
+            test_data = client.get(url).json()
+            assert len(test_data['results']) <= 2
+            received.extend(item['id'] for item in test_data['results'])
+            url = test_data['next']
+
+        assert received == [comment.id for comment in comments], (
+            'Check that cursor pages return every comment once, oldest first'
+        )
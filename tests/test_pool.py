@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+from django.db import OperationalError, connections
+
+from api.instrumentation import pools
+from yatube_api.backends.pool import ConnectionPool, get_pool
+
+
+@pytest.fixture
+def pooled(transactional_db, tmp_path):
+    """A database alias using the pooled SQLite backend."""
+    alias = 'pooled'
+    connections.databases[alias] = {
+        'ENGINE': 'yatube_api.backends.sqlite3',
+        'NAME': str(tmp_path / 'pooled.sqlite3'),
+        'POOL': {'MAX_SIZE': 2, 'TIMEOUT': 0.1, 'CHECK_AFTER': 0},
+    }
+    connections.ensure_defaults(alias)
+    pools.reset()
+    yield alias
+    connections[alias].close()
+    get_pool(alias).clear()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+def query(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        return cursor.fetchone()
+
+
+class TestConnectionPool:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_connections_are_reused(self, pooled):
+        query(pooled)
+        raw = connections[pooled].connection
+        connections[pooled].close()
+        assert get_pool(pooled).idle, (
+            'Check that closing a pooled connection returns it to the pool'
+        )
+        query(pooled)
+        assert connections[pooled].connection is raw, (
+            'Check that a pooled connection is reused'
+        )
+        metrics = pools.snapshot()[pooled]
+        assert metrics['wait_ms']['count'] == 2
+        assert metrics['connect_ms']['count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_broken_connection_is_replaced(self, pooled):
+        query(pooled)
+        raw = connections[pooled].connection
+        connections[pooled].close()
+        raw.close()
+        assert query(pooled) == (1,), (
+            'Check that an idle connection failing the health check is replaced'
+        )
+        assert connections[pooled].connection is not raw
+        assert get_pool(pooled).size == 1
+
+    def test_exhausted_pool_times_out(self):
+        pool = ConnectionPool('test', {'MAX_SIZE': 1, 'TIMEOUT': 0.05})
+        first = pool.acquire(object)
+        with pytest.raises(OperationalError):
+            pool.acquire(object)
+
+        threading.Timer(0.01, pool.release, [first]).start()
+        pool.timeout = 1
+        assert pool.acquire(object) is first, (
+            'Check that a waiting checkout gets the released connection'
+        )
+        assert pool.size == 1
@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Follow, Post
+from tests.utils import assert_constant_queries, count_queries
+
+
+class TestQueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_list_queries(self, client, django_user_model, group_1):
+        def add_rows(count):
+            for _ in range(count):
+                author = django_user_model.objects.create_user(
+                    username=f'author_{Post.objects.count()}')
+                Post.objects.create(text='Пост', author=author, group=group_1)
+
+        assert_constant_queries(client, '/api/v1/posts/', add_rows)
+        assert_constant_queries(client, '/api/v1/posts/?limit=50', add_rows)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_list_queries(self, client, django_user_model, post):
+        def add_rows(count):
+            for _ in range(count):
+                author = django_user_model.objects.create_user(
+                    username=f'commentator_{Comment.objects.count()}')
+                Comment.objects.create(author=author, post=post, text='Текст')
+
+        assert_constant_queries(
+            client, f'/api/v1/posts/{post.id}/comments/', add_rows)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_single_lookup(self, settings, user_client, post, comment_1_post):
+        settings.API_CACHE_TIMEOUT = 0
+        url = f'/api/v1/posts/{post.id}/comments/'
+        user_client.get(url)
+        assert count_queries(user_client, url) == 2, (
+            'Check that an uncached comment list only reads the '
+            'Last-Modified time of the post and the comments'
+        )
+        assert count_queries(user_client, f'{url}{comment_1_post.id}/') == 1, (
+            'Check that a comment is retrieved with a single query'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, {'text': 'Новый'})
+        assert response.status_code == 201
+        writes = [query['sql'] for query in context.captured_queries
+                  if query['sql'].startswith(('SELECT', 'INSERT', 'UPDATE'))]
+        assert len(writes) == 2, (
+            'Check that creating a comment runs only the insert and the '
+            f'counter update, got {writes}'
+        )
+
+        response = user_client.post('/api/v1/posts/100500/comments/', {'text': 'Новый'})
+        assert response.status_code == 404
+        assert user_client.get('/api/v1/posts/100500/comments/').status_code == 404
+        assert user_client.get(
+            f'/api/v1/posts/100500/comments/{comment_1_post.id}/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_list_queries(self, user_client, user, django_user_model):
+        def add_rows(count):
+            for _ in range(count):
+                author = django_user_model.objects.create_user(
+                    username=f'following_{Follow.objects.count()}')
+                Follow.objects.create(user=user, following=author)
+
+        assert_constant_queries(user_client, '/api/v1/follow/', add_rows)
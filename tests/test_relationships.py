@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.counters import recount
+from posts.models import Follow, Profile
+
+
+class TestRelationships:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_followers_and_following(self, client, user, user_2, another_user,
+                                     follow_1, follow_2, follow_3, follow_4):
+        response = client.get(f'/api/v1/users/{user.username}/followers/')
+        assert response.status_code == 200, (
+            'Check that the followers of a user are listed without a token'
+        )
+        assert [item['username'] for item in response.json()['results']] == [
+            user_2.username, another_user.username
+        ], 'Check that followers are ordered by case-folded username'
+        assert set(response.json()['results'][0]) == {
+            'username', 'followers_count', 'following_count'
+        }
+
+        response = client.get(f'/api/v1/users/{user_2.username}/following/')
+        assert [item['username'] for item in response.json()['results']] == [
+            user.username, another_user.username
+        ], 'Check that the followed authors of a user are listed'
+
+        response = client.get('/api/v1/users/nobody/followers/')
+        assert response.status_code == 404, (
+            'Check that the followers of an unknown user are not found'
+        )
+        response = client.get(f'/api/v1/users/{user_2.username}/followers/')
+        assert response.status_code == 200
+        assert response.json()['results'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cursor_and_prefix_search(self, client, django_user_model, user):
+        names = ['bob', 'Alice', 'alina', 'ALBERT', 'carol']
+        for name in names:
+            follower = django_user_model.objects.create_user(
+                username=name, password='1234567')
+            Follow.objects.create(user=follower, following=user)
+
+        url = f'/api/v1/users/{user.username}/followers/'
+        seen = []
+        next_url = f'{url}?page_size=2'
+        while next_url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(next_url)
+            assert len(context.captured_queries) == 1, (
+                'Check that a page of followers takes a single query'
+            )
+            seen.extend(item['username'] for item in response.json()['results'])
+            next_url = response.json()['next']
+        assert seen == ['ALBERT', 'Alice', 'alina', 'bob', 'carol'], (
+            'Check that the cursor walks every follower once'
+        )
+
+        response = client.get(url, {'search': 'Ali'})
+        assert [item['username'] for item in response.json()['results']] == [
+            'Alice', 'alina'
+        ], 'Check that the search matches a case-insensitive prefix'
+        response = client.get(url, {'search': 'lic'})
+        assert response.json()['results'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_username_key_follows_renames(self, user):
+        assert Profile.objects.get(user=user).username_key == 'testuser'
+        user.username = 'Renamed'
+        user.save()
+        assert Profile.objects.get(user=user).username_key == 'renamed', (
+            'Check that renaming a user updates the username key'
+        )
+        Profile.objects.filter(user=user).update(username_key='stale')
+        assert recount()['profile username keys'] == 1, (
+            'Check that recount repairs stale username keys'
+        )
+        assert Profile.objects.get(user=user).username_key == 'renamed'
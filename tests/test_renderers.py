@@ -0,0 +1,118 @@
+import datetime
+import decimal
+import io
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+
+from api.parsers import CBORParser, MessagePackParser
+from api.renderers import CBORRenderer, MessagePackRenderer
+
+FORMATS = {
+    'application/msgpack': (MessagePackRenderer, MessagePackParser),
+    'application/cbor': (CBORRenderer, CBORParser),
+}
+
+
+def dumps(media_type, data):
+    return FORMATS[media_type][0]().render(data)
+
+
+def loads(media_type, body):
+    return FORMATS[media_type][1]().parse(io.BytesIO(body))
+
+
+class TestBinaryFormats:
+
+    @pytest.mark.parametrize('media_type', FORMATS)
+    def test_round_trip(self, media_type):
+        data = {
+            'ints': [0, 23, 24, 255, 65536, 2 ** 63 - 1, -1, -2 ** 63],
+            'floats': [0.5, -1.25, 1e300],
+            'text': ['', 'short', 'ю' * 40, 'x' * 70000],
+            'flags': [None, True, False],
+            'nested': {'list': [{'a': 1}] * 20, 'empty': {}},
+        }
+        assert loads(media_type, dumps(media_type, data)) == data, (
+            'Check that encoded data decodes back unchanged'
+        )
+
+    def test_json_conversions(self):
+        data = {'date': datetime.date(2026, 10, 18), 'amount': decimal.Decimal('1.5'),
+                'lazy': gettext_lazy('Not found.')}
+        assert loads('application/msgpack', dumps('application/msgpack', data)) == {
+            'date': '2026-10-18', 'amount': 1.5, 'lazy': 'Not found.',
+        }, 'Check that other values are converted like the JSON renderer does'
+        assert loads('application/cbor', dumps('application/cbor', {'lazy': data['lazy']})) == {
+            'lazy': 'Not found.'
+        }
+
+    @pytest.mark.parametrize('media_type, body', [
+        ('application/msgpack', b'\x92\x01'),
+        ('application/msgpack', b'\xc1'),
+        ('application/msgpack', b'\x01\x02'),
+        ('application/msgpack', b'\x81\x91\x01\x01'),
+        ('application/msgpack', b'\xc7\x01\x05\x00'),
+        ('application/msgpack', b'\xd6\xff\x00\x00\x00\x01'),
+        ('application/msgpack', b'\x91\xd6\xff\x00\x00\x00\x01'),
+        ('application/msgpack', b'\x81\xa1a\xd6\xff\x00\x00\x00\x01'),
+        ('application/cbor', b'\x82\x01'),
+        ('application/cbor', b'\x01\x02'),
+        ('application/cbor', b'\x81' * 1000),
+        ('application/cbor', b''),
+    ])
+    def test_malformed(self, media_type, body):
+        with pytest.raises(ParseError):
+            loads(media_type, body)
+
+
+class TestBinaryRenderers:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('media_type', FORMATS)
+    def test_render(self, client, post, another_post, media_type):
+        expected = client.get('/api/v1/posts/').json()
+        response = client.get('/api/v1/posts/', HTTP_ACCEPT=media_type)
+        assert response.status_code == 200
+        assert response['Content-Type'] == media_type
+        assert loads(media_type, response.content) == expected, (
+            'Check that binary formats carry the same data as JSON'
+        )
+
+        response = client.get(f'/api/v1/groups/?format={media_type.split("/")[1]}')
+        assert response['Content-Type'] == media_type, (
+            'Check that the format can be chosen with `?format=`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('media_type', FORMATS)
+    def test_parse(self, user_client, group_1, media_type):
+        response = user_client.post(
+            '/api/v1/posts/', data=dumps(media_type, {'text': 'Binary post', 'group': group_1.id}),
+            content_type=media_type, HTTP_ACCEPT=media_type)
+        assert response.status_code == 201, (
+            'Check that posts can be created from a binary request body'
+        )
+        assert loads(media_type, response.content)['text'] == 'Binary post'
+
+        response = user_client.post(
+            '/api/v1/posts/', data=b'\xc1', content_type=media_type)
+        assert response.status_code == 400, (
+            'Check that malformed binary bodies are rejected'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_etag_per_format(self, client, post):
+        url = f'/api/v1/posts/{post.id}/'
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_ACCEPT='application/msgpack',
+                              HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Check that the ETag of a JSON response does not match other formats'
+        )
+        assert response['ETag'] != etag
+        assert 'Accept' in response['Vary']
+        response = client.get(url, HTTP_ACCEPT='application/msgpack',
+                              HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304
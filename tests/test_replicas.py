@@ -0,0 +1,117 @@
+import json
+
+import pytest
+from django.db import OperationalError, connections
+
+from api.checks import check_replica_pins
+from api.replicas import pool
+from posts.models import Post
+
+
+@pytest.fixture
+def replica(transactional_db, settings, tmp_path):
+    """A second SQLite database registered as the only replica."""
+    alias = 'replica'
+    database = dict(connections.databases['default'])
+    database.update(NAME=str(tmp_path / 'replica.sqlite3'), TEST={})
+    connections.databases[alias] = database
+    connections.ensure_defaults(alias)
+    settings.DATABASE_REPLICAS = [alias]
+    settings.API_CACHE_TIMEOUT = 0
+    pool.reset()
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+    pool.reset()
+
+
+def replicate(alias):
+    """Copy the primary database into the replica."""
+    for connection in (connections['default'], connections[alias]):
+        connection.ensure_connection()
+    connections['default'].connection.backup(connections[alias].connection)
+
+
+class TestReplicaRouting:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reads_go_to_replica(self, client, post, replica):
+        replicate(replica)
+        Post.objects.using(replica).filter(pk=post.pk).update(text='С реплики')
+        response = client.get(f'/api/v1/posts/{post.id}/')
+        assert response.status_code == 200
+        assert response.json()['text'] == 'С реплики', (
+            'Check that safe requests read from the replica'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_writer_is_pinned_to_primary(self, client, user_client, user, post, replica):
+        replicate(replica)
+        response = user_client.patch(f'/api/v1/posts/{post.id}/', {'text': 'Новый текст'})
+        assert response.status_code == 200
+        assert Post.objects.using(replica).get(pk=post.pk).text != 'Новый текст'
+
+        response = user_client.get(f'/api/v1/posts/{post.id}/')
+        assert response.json()['text'] == 'Новый текст', (
+            'Check that a user reads their own writes from the primary'
+        )
+        response = client.get(f'/api/v1/posts/{post.id}/')
+        assert response.json()['text'] == post.text, (
+            'Check that other users keep reading from the replica'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_unhealthy_replica_is_skipped(self, client, post, replica, settings):
+        replicate(replica)
+        settings.DATABASE_REPLICAS = [replica, 'missing']
+        connections.databases['missing'] = dict(
+            connections.databases[replica], NAME='/nonexistent/dir/missing.sqlite3')
+        connections.ensure_defaults('missing')
+        try:
+            for _ in range(4):
+                response = client.get(f'/api/v1/posts/{post.id}/')
+                assert response.status_code == 200, (
+                    'Check that reads skip a replica that cannot be reached'
+                )
+            assert not pool.is_up('missing')
+            assert pool.choose() == replica
+        finally:
+            del connections['missing']
+            del connections.databases['missing']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_health_checks_are_scheduled(self, client, post, replica, settings, monkeypatch):
+        replicate(replica)
+        checks = []
+        check = pool.check
+        monkeypatch.setattr(pool, 'check', lambda alias: checks.append(alias) or check(alias))
+        for _ in range(3):
+            assert client.get(f'/api/v1/posts/{post.id}/').status_code == 200
+        assert checks == [replica], (
+            'Check that a healthy replica is not checked on every request'
+        )
+
+        pool.report_error(replica, OperationalError('connection lost'))
+        assert pool.choose() is None, (
+            'Check that a replica failing a read leaves the rotation'
+        )
+
+    def test_local_cache_warning(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        assert [warning.id for warning in check_replica_pins(None)] == ['api.W001'], (
+            'Check that replica pins in a process-local cache are reported'
+        )
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                       'LOCATION': 'api_cache'}}
+        assert check_replica_pins(None) == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_reads_from_replica(self, client, post, replica):
+        replicate(replica)
+        Post.objects.using(replica).filter(pk=post.pk).update(text='С реплики')
+        response = client.get('/api/v1/posts/?format=ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert json.loads(lines[0])['text'] == 'С реплики', (
+            'Check that streamed exports read from the chosen replica'
+        )
@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from posts.models import Post
+
+
+class TestPostSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search(self, client, user):
+        first = Post.objects.create(text='Кот спит на диване', author=user)
+        second = Post.objects.create(text='Кот и кот: два кота, кот', author=user)
+        Post.objects.create(text='Собака гуляет', author=user)
+
+        response = client.get('/api/v1/posts/?search=кот')
+        assert response.status_code == 200
+        ids = [item['id'] for item in response.json()]
+        assert ids == [second.id, first.id], (
+            'Check that `?search=` returns matching posts, best matches first'
+        )
+
+        response = client.get('/api/v1/posts/?search=кот&limit=1')
+        assert [item['id'] for item in response.json()['results']] == [second.id]
+
+        first.text = 'Пёс спит'
+        first.save()
+        second.delete()
+        response = client.get('/api/v1/posts/?search=кот')
+        assert response.json() == [], (
+            'Check that the search index follows updates and deletes of posts'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_syntax_is_escaped(self, client, post):
+        response = client.get('/api/v1/posts/?search="OR (NEAR*')
+        assert response.status_code == 200
+        assert client.get('/api/v1/posts/?search=%20').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_rejects_cursor(self, client, post):
+        response = client.get('/api/v1/posts/?search=пост&cursor=')
+        assert response.status_code == 400, (
+            'Check that ranked search results are not paginated by cursor'
+        )
+        assert client.get('/api/v1/posts/?search=пост&limit=1').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_command(self, client, user):
+        post = Post.objects.create(text='Уникальное слово', author=user)
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO posts_post_fts(posts_post_fts) VALUES ('delete-all')")
+        assert client.get('/api/v1/posts/?search=уникальное').json() == []
+
+        call_command('rebuild_search_index')
+        assert [item['id'] for item in client.get('/api/v1/posts/?search=уникальное').json()] == [post.id]
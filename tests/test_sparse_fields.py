@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class TestSparseFields:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('fast', [False, True])
+    def test_post_list_fields(self, settings, client, post, post_2, another_post, fast):
+        settings.API_FAST_LIST_SERIALIZERS = fast
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/posts/', {'fields': 'id,text'})
+        assert response.status_code == 200
+        assert all(set(item) == {'id', 'text'} for item in response.json()), (
+            'Check that `?fields=` keeps only the requested fields'
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert 'auth_user' not in sql and '"image"' not in sql, (
+            'Check that unrequested fields are neither joined nor selected'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/posts/', {'exclude': 'text,author'})
+        assert all('text' not in item and 'author' not in item and 'id' in item
+                   for item in response.json()), (
+            'Check that `?exclude=` leaves out the given fields'
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert 'auth_user' not in sql and '"text"' not in sql
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('fast', [False, True])
+    def test_cursor_with_fields(self, settings, client, post, post_2, another_post, fast):
+        settings.API_FAST_LIST_SERIALIZERS = fast
+        ids = []
+        next_url = '/api/v1/posts/?cursor=&page_size=2&fields=id'
+        while next_url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(next_url)
+            assert len(context.captured_queries) == 1, (
+                'Check that the ordering columns are loaded with the page'
+            )
+            ids.extend(item['id'] for item in response.json()['results'])
+            next_url = response.json()['next']
+        assert ids == [another_post.id, post_2.id, post.id]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_other_viewsets(self, user_client, post, comment_1_post, group_1, follow_1, another_user):
+        response = user_client.get(f'/api/v1/posts/{post.id}/', {'fields': 'text'})
+        assert response.json() == {'text': post.text}
+        response = user_client.get(f'/api/v1/posts/{post.id}/comments/', {'fields': 'id'})
+        assert response.json() == [{'id': comment_1_post.id}]
+        response = user_client.get('/api/v1/groups/', {'fields': 'slug'})
+        assert response.json() == [{'slug': group_1.slug}]
+        response = user_client.get('/api/v1/follow/', {'exclude': 'user'})
+        assert response.json() == [{'following': another_user.username}]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_unknown_fields(self, client, post):
+        response = client.get('/api/v1/posts/', {'fields': 'id,secret'})
+        assert response.status_code == 400, (
+            'Check that unknown names in `?fields=` are rejected'
+        )
+        assert 'fields' in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_writes_ignore_fields(self, user_client):
+        response = user_client.post('/api/v1/posts/?fields=id', data={'text': 'Post'})
+        assert response.status_code == 201
+        assert response.json()['text'] == 'Post', (
+            'Check that sparse fieldsets only apply to safe requests'
+        )
@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+import pytest
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from posts.counters import recount
+from posts.models import Post, StoredFile
+from posts.storage import ContentAddressedStorage
+from tests.test_images import make_image
+
+
+class TestContentAddressedStorage:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_save_deduplicates(self, tmp_path):
+        storage = ContentAddressedStorage(location=str(tmp_path))
+        digest = hashlib.sha256(b'content').hexdigest()
+
+        name = storage.save('posts/Photo.JPG', ContentFile(b'content'))
+        assert name == f'posts/{digest[:2]}/{digest[2:4]}/{digest}.jpg', (
+            'Check that files are stored under the sharded hash of their content'
+        )
+        assert storage.save('posts/other.jpg', ContentFile(b'content')) == name
+        assert storage.save('posts/x.jpg', ContentFile(b'other')) != name
+        assert storage.open(name).read() == b'content'
+        assert not [path for path in os.listdir(tmp_path) if path.startswith('.')], (
+            'Check that no temporary files are left behind'
+        )
+        assert StoredFile.objects.get(name=name).references == 2, (
+            'Check that every save counts a reference to the stored file'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_release_keeps_reused_file(self, tmp_path):
+        storage = ContentAddressedStorage(location=str(tmp_path))
+        name = storage.save('posts/a.jpg', ContentFile(b'content'))
+        with transaction.atomic():
+            storage.release([name])
+            assert storage.save('posts/b.jpg', ContentFile(b'content')) == name
+        assert storage.exists(name), (
+            'Check that a file saved again before the release commits is kept'
+        )
+
+        storage.release([name])
+        assert not storage.exists(name)
+        assert not StoredFile.objects.filter(name=name).exists()
+        assert storage.save('posts/c.jpg', ContentFile(b'content')) == name
+        assert storage.open(name).read() == b'content', (
+            'Check that a save after the file was deleted writes it again'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_shared_image_is_deleted_with_last_post(self, user_client, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.POST_IMAGE_PROCESSING_SYNC = True
+        settings.POST_IMAGE_VARIANTS = {
+            'thumbnail': {'size': (320, 320), 'format': 'JPEG'},
+        }
+        for _ in range(2):
+            response = user_client.post(
+                '/api/v1/posts/', {'text': 'Пост', 'image': make_image()},
+                format='multipart')
+            assert response.status_code == 201
+        first, second = Post.objects.order_by('id')
+        assert first.image.name == second.image.name, (
+            'Check that identical uploads share one stored file'
+        )
+        assert first.image_variants == second.image_variants
+        variant = first.image_variants.split('"')[3]
+        assert variant.count('/') == 3, (
+            'Check that variants are sharded like any other stored file'
+        )
+        files = [first.image.path, tmp_path / variant]
+        StoredFile.objects.update(references=5)
+        assert recount()['stored files'] == 2, (
+            'Check that recount repairs drifted reference counts'
+        )
+
+        user_client.delete(f'/api/v1/posts/{first.id}/')
+        assert all(os.path.exists(path) for path in files), (
+            'Check that files still referenced by another post are kept'
+        )
+        user_client.delete(f'/api/v1/posts/{second.id}/')
+        assert not any(os.path.exists(path) for path in files), (
+            'Check that files are deleted with the last post using them'
+        )
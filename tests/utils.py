@@ -0,0 +1,29 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Check that a GET request to `{url}` returns status 200'
+    )
+    return len(context.captured_queries)
+
+
+def assert_constant_queries(client, url, add_rows, sizes=(1, 5, 20)):
+    """Check that `url` costs the same number of queries for any row count.
+
+    `add_rows(n)` must add `n` more rows to the response of `url`. A first
+    request warms up the per-process caches.
+    """
+    client.get(url)
+    counts = []
+    for size in sizes:
+        add_rows(size)
+        counts.append(count_queries(client, url))
+    assert len(set(counts)) == 1, (
+        f'Check that a GET request to `{url}` runs a constant number of '
+        f'queries regardless of the number of rows, got {counts}'
+    )
+    return counts[0]
@@ -0,0 +1,322 @@
+"""Async read path for the hottest read-only endpoints.
+
+`ReadPathApplication` answers anonymous JSON GET requests for the post
+list and detail, the group list and the comment list itself. The ORM runs
+in worker threads and independent queries of one response run
+concurrently, so a slow read does not pin a worker. Every other request,
+including any query parameter the async handlers do not understand or a
+Host header Django would reject, goes to the regular Django application.
+
+Post details and comment lists carry the same ETag and Last-Modified as
+the regular responses, so clients can revalidate them; conditional
+requests themselves are answered by Django. Responses carry the headers
+the security and clickjacking middleware would add. With
+`API_INSTRUMENTATION` on they also carry a `Server-Timing` header, and
+their timings go into `api.instrumentation.registry` under the names of
+the regular views.
+
+The post list counts and fetches its page concurrently. A post detail is
+a single query, as the author comes in a join, and its comments are
+served by their own route: the comment list reads the Last-Modified time
+of the post before the comments, so it never reports a change older than
+the comments it sends.
+"""
+import asyncio
+import contextvars
+import re
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http.request import split_domain_port, validate_host
+from django.utils.http import http_date
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.renderers import JSONRenderer
+
+from posts.models import Comment, Group, Post
+from .cache import get_etag
+from .fast_serializers import get_values_serializer
+from .instrumentation import registry
+from .middleware import (RequestTiming, measure_serialization,
+                         recording_queries)
+from .replicas import pool, reading_from
+from .serializers import CommentSerializer, GroupSerializer, PostSerializer
+
+JSON_MEDIA_TYPES = ('', '*/*', 'application/json', 'application/*')
+
+
+async def run_query(request, function, *args):
+    """Run an ORM call in a worker thread, reading from a replica.
+
+    Its queries are added to `request.timing`, unless that is None.
+    """
+    timing = None if request.timing is None else RequestTiming()
+
+    def call():
+        close_old_connections()
+        try:
+            with reading_from(pool.choose()), recording_queries(timing):
+                return function(*args)
+        finally:
+            close_old_connections()
+    try:
+        return await sync_to_async(call, thread_sensitive=False)()
+    finally:
+        # Merged here, as concurrent queries run in different threads.
+        if timing is not None:
+            request.timing.queries += timing.queries
+            request.timing.db_time += timing.db_time
+
+
+class NotFound(Exception):
+    pass
+
+
+class ReadRequest:
+    """The parts of an ASGI request the handlers and paginators use."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.path = scope['path']
+        self.timing = (
+            RequestTiming() if settings.API_INSTRUMENTATION else None)
+        self.headers = {
+            name.decode('latin1'): value.decode('latin1')
+            for name, value in scope['headers']
+        }
+        self.query_string = scope.get('query_string', b'').decode()
+        self.query_params = {
+            key: values[-1] for key, values in
+            parse_qs(self.query_string, keep_blank_values=True).items()
+        }
+
+    def get_host(self):
+        """Return the host like `HttpRequest.get_host()`, None if invalid."""
+        host = self.headers.get('host')
+        if host is None:
+            server, port = self.scope.get('server') or ('localhost', 80)
+            host = f'{server}:{port}'
+        allowed_hosts = settings.ALLOWED_HOSTS
+        if settings.DEBUG and not allowed_hosts:
+            allowed_hosts = ['.localhost', '127.0.0.1', '[::1]']
+        domain, port = split_domain_port(host)
+        if not domain or not validate_host(domain, allowed_hosts):
+            return None
+        return host
+
+    def build_absolute_uri(self, location=None):
+        if location is not None and '://' in location:
+            return location
+        host = self.get_host()
+        if location is None:
+            location = self.path
+            if self.query_string:
+                location += '?' + self.query_string
+        return f'{self.scope.get("scheme", "http")}://{host}{location}'
+
+    def is_secure(self):
+        return self.scope.get('scheme') in ('https', 'wss')
+
+
+def serialize(serializer_class, rows, request):
+    with measure_serialization(request):
+        return get_values_serializer(serializer_class).serialize(
+            rows, {'request': request})
+
+
+def get_security_headers(request):
+    """Headers the security and clickjacking middleware would add."""
+    headers = []
+    if 'django.middleware.security.SecurityMiddleware' in settings.MIDDLEWARE:
+        if settings.SECURE_HSTS_SECONDS and request.is_secure():
+            value = f'max-age={settings.SECURE_HSTS_SECONDS}'
+            if settings.SECURE_HSTS_INCLUDE_SUBDOMAINS:
+                value += '; includeSubDomains'
+            if settings.SECURE_HSTS_PRELOAD:
+                value += '; preload'
+            headers.append((b'strict-transport-security', value.encode()))
+        if settings.SECURE_CONTENT_TYPE_NOSNIFF:
+            headers.append((b'x-content-type-options', b'nosniff'))
+        if settings.SECURE_BROWSER_XSS_FILTER:
+            headers.append((b'x-xss-protection', b'1; mode=block'))
+    if ('django.middleware.clickjacking.XFrameOptionsMiddleware'
+            in settings.MIDDLEWARE):
+        value = getattr(settings, 'X_FRAME_OPTIONS', 'SAMEORIGIN').upper()
+        headers.append((b'x-frame-options', value.encode()))
+    return headers
+
+
+def get_rows(serializer_class, queryset, *extra):
+    values_serializer = get_values_serializer(serializer_class)
+    queryset = serializer_class.setup_eager_loading(queryset)
+    return queryset.values(*values_serializer.lookups, *extra)
+
+
+async def list_posts(request):
+    """Return the data of the response and its Last-Modified time."""
+    rows = get_rows(PostSerializer, Post.objects.all())
+    paginator = LimitOffsetPagination()
+    paginator.request = request
+    paginator.limit = paginator.get_limit(request)
+    if paginator.limit is None:
+        return serialize(PostSerializer, await run_query(request, list, rows),
+                         request), None
+    paginator.offset = paginator.get_offset(request)
+    page = rows[paginator.offset:paginator.offset + paginator.limit]
+    paginator.count, page = await asyncio.gather(
+        run_query(request, rows.count), run_query(request, list, page))
+    return paginator.get_paginated_response(
+        serialize(PostSerializer, page, request)).data, None
+
+
+async def retrieve_post(request, pk):
+    rows = get_rows(PostSerializer, Post.objects.filter(pk=pk), 'updated')
+    found = await run_query(request, list, rows)
+    if not found:
+        raise NotFound
+    return serialize(PostSerializer, found, request)[0], found[0]['updated']
+
+
+async def list_groups(request):
+    rows = get_rows(GroupSerializer, Group.objects.all())
+    return serialize(GroupSerializer, await run_query(request, list, rows),
+                     request), None
+
+
+async def list_comments(request, post_id):
+    # Read before the comments, like `CommentViewSet.get_last_modified()`.
+    last_modified = await run_query(
+        request, Post.objects.filter(pk=post_id).values_list(
+            'updated', flat=True).first)
+    if last_modified is None:
+        raise NotFound
+    rows = get_rows(
+        CommentSerializer,
+        Comment.objects.filter(post=post_id).order_by('created', 'id')
+    )
+    comments = await run_query(request, list, rows)
+    return serialize(CommentSerializer, comments, request), last_modified
+
+
+# (path, handler, query parameters, serializer, name of the regular view)
+ROUTES = (
+    (re.compile(r'^/api/v1/posts/$'), list_posts, {'limit', 'offset'},
+     PostSerializer, 'api:posts-list:list'),
+    (re.compile(r'^/api/v1/posts/(?P<pk>\d+)/$'), retrieve_post, set(),
+     PostSerializer, 'api:posts-detail:retrieve'),
+    (re.compile(r'^/api/v1/groups/$'), list_groups, set(), GroupSerializer,
+     'api:groups-list:list'),
+    (re.compile(r'^/api/v1/posts/(?P<post_id>\d+)/comments/$'),
+     list_comments, set(), CommentSerializer, 'api:comments-list:list'),
+)
+
+
+class ReadPathApplication:
+    """ASGI application serving the async read path before `fallback`."""
+
+    renderer = JSONRenderer()
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    @staticmethod
+    def is_served(request):
+        """Return whether the headers leave `request` to the async path."""
+        if 'authorization' in request.headers:
+            return False
+        # Django redirects to HTTPS first.
+        if settings.SECURE_SSL_REDIRECT and not request.is_secure():
+            return False
+        # Django answers a disallowed host with 400.
+        if request.get_host() is None:
+            return False
+        # Conditional requests are answered by the regular application.
+        if ('if-none-match' in request.headers
+                or 'if-modified-since' in request.headers):
+            return False
+        accept = request.headers.get('accept', '')
+        return accept.split(';')[0].strip() in JSON_MEDIA_TYPES
+
+    def resolve(self, scope):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return None
+        # Hosts and schemes taken from proxy headers are left to Django.
+        if (getattr(settings, 'USE_X_FORWARDED_HOST', False)
+                or getattr(settings, 'SECURE_PROXY_SSL_HEADER', None)):
+            return None
+        request = ReadRequest(scope)
+        if not self.is_served(request):
+            return None
+        for pattern, handler, params, serializer_class, view in ROUTES:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if (not set(request.query_params) <= params
+                    or get_values_serializer(serializer_class) is None):
+                return None
+            return request, handler, match.groupdict(), view
+        return None
+
+    async def __call__(self, scope, receive, send):
+        resolved = self.resolve(scope)
+        if resolved is None:
+            # asgiref leaves the executor of a finished `async_to_sync` in
+            # the context; servers that start the next request of a
+            # keep-alive connection from this task would inherit it.
+            return await contextvars.Context().run(
+                asyncio.ensure_future, self.fallback(scope, receive, send))
+        request, handler, kwargs, view = resolved
+        headers = get_security_headers(request)
+        try:
+            data, last_modified = await handler(request, **kwargs)
+        except NotFound:
+            status, data = 404, {'detail': 'Not found.'}
+        else:
+            status = 200
+            if last_modified is not None:
+                headers += [
+                    (b'etag', get_etag(data).encode()),
+                    (b'last-modified',
+                     http_date(last_modified.timestamp()).encode()),
+                ]
+        render_start = time.perf_counter()
+        body = self.renderer.render(data)
+        if request.timing is not None:
+            headers.append(
+                (b'server-timing', self.record(request, view, body,
+                                               render_start).encode()))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'vary', b'Accept'),
+                *headers,
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    def record(self, request, view, body, render_start):
+        """Record the timings of the request, return its Server-Timing."""
+        timing = request.timing
+        end = time.perf_counter()
+        # Concurrent queries overlap, so `app` is not derived from them.
+        metrics = {
+            'total_ms': (end - timing.start) * 1000,
+            'db_ms': timing.db_time * 1000,
+            'serialize_ms': timing.serialize_time * 1000,
+            'render_ms': (end - render_start) * 1000,
+            'queries': timing.queries,
+            'response_bytes': len(body),
+        }
+        registry.record(view, metrics)
+        return ', '.join(
+            '{};dur={:.2f}{}'.format(name, metrics[f'{name}_ms'], suffix)
+            for name, suffix in (
+                ('db', f';desc="{timing.queries} queries"'),
+                ('serialize', ''), ('render', ''), ('total', ''),
+            )
+        )
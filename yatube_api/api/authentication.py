@@ -0,0 +1,113 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .cache import bump_tags, get_tag_versions
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        if ttl <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, predicate):
+        """Drop every entry whose value satisfies `predicate`."""
+        with self.lock:
+            for key in [key for key, (value, _) in self.entries.items()
+                        if predicate(value)]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def get_cache_size():
+    return getattr(settings, 'API_AUTH_CACHE_SIZE', 1024)
+
+
+tokens = TTLCache(get_cache_size())
+# user id -> (version of the user tag, user)
+users = TTLCache(get_cache_size())
+
+
+def get_user_tag(user_id):
+    return f'user:{user_id}'
+
+
+def forget_user(user_id):
+    """Drop the cached user, in every process, and its cached tokens."""
+    bump_tags(get_user_tag(user_id))
+    users.discard(lambda entry: entry[1].pk == user_id)
+    tokens.discard(
+        lambda token: token[jwt_settings.USER_ID_CLAIM] == user_id)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that remembers verified tokens and their users.
+
+    A token is cached for at most `API_AUTH_CACHE_TTL` seconds and never
+    past its own expiry. Cached users are checked against a version kept
+    in the API cache, which saving or deleting the row bumps, e.g. on
+    deactivation or a password change, so every process sharing that
+    cache reloads them. Bulk `QuerySet.update()` sends no signal; call
+    `forget_user` after it, or the old user may be served for up to
+    `API_AUTH_CACHE_TTL` seconds. So may processes whose API cache is not
+    shared.
+    """
+
+    def get_ttl(self, validated_token):
+        lifetime = jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        ttl = min(getattr(settings, 'API_AUTH_CACHE_TTL', 60), lifetime)
+        expires_in = validated_token.get('exp', 0) - time.time()
+        return min(ttl, expires_in)
+
+    def get_validated_token(self, raw_token):
+        key = hashlib.sha256(raw_token).hexdigest()
+        validated_token = tokens.get(key)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            tokens.set(key, validated_token, self.get_ttl(validated_token))
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        # Read before the user, so that a change in between only makes
+        # the entry look stale.
+        version, = get_tag_versions([get_user_tag(user_id)])
+        entry = users.get(user_id)
+        if entry is None or entry[0] != version:
+            user = super().get_user(validated_token)
+            entry = (version, user)
+            users.set(user_id, entry, self.get_ttl(validated_token))
+        return copy.copy(entry[1])
@@ -0,0 +1,185 @@
+"""Response cache for read-only endpoints.
+
+Entries are keyed on the request path, its query parameters, whether the
+request is authenticated and the current versions of the tags the view
+declares. Saving or deleting a post, comment or group bumps the versions
+of the tags it affects (see `api.signals`), so a stale entry is never read
+again and simply expires.
+
+Responses carry an ETag and, for views that know when their data last
+changed, a Last-Modified time; conditional requests that match either get
+304 from the cache or from the modification time alone, without
+serializing anything.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def is_shared(cache):
+    """Whether the entries of `cache` are seen by every process."""
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def get_tag_key(tag):
+    return f'api:tag:{tag}'
+
+
+def new_version():
+    # Versions start from the clock so that a tag evicted from the cache
+    # never comes back with a version an old entry was stored under.
+    return time.time_ns()
+
+
+def get_tag_versions(tags):
+    cache = get_cache()
+    keys = [get_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_tags(*tags):
+    cache = get_cache()
+    for tag in tags:
+        key = get_tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_version(), None)
+
+
+def get_etag(data):
+    content = json.dumps(data, sort_keys=True, default=str)
+    return 'W/"{}"'.format(hashlib.md5(content.encode()).hexdigest())
+
+
+def get_representation_etag(etag, request):
+    """Tell apart the ETags of the formats the same data is rendered in."""
+    renderer_format = getattr(request.accepted_renderer, 'format', 'json')
+    if renderer_format == 'json':
+        return etag
+    return f'{etag[:-1]}-{renderer_format}"'
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = {candidate.strip() for candidate in header.split(',')}
+    return '*' in candidates or etag in candidates
+
+
+def not_modified_since(request, last_modified):
+    """Whether `If-Modified-Since` is at or after `last_modified`.
+
+    `If-None-Match` takes precedence, so the header is ignored when the
+    request has one.
+    """
+    if last_modified is None or 'HTTP_IF_NONE_MATCH' in request.META:
+        return False
+    since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+class CachedResponseMixin:
+    """Caches the serialized data of read-only actions.
+
+    Views list the actions to cache in `cache_actions` and the tags an
+    entry depends on in `get_cache_tags()`. Responses carry an ETag and
+    requests with a matching `If-None-Match` get 304 without a body. Views
+    that implement `get_last_modified()` also answer `If-Modified-Since`.
+    """
+
+    cache_actions = ('list', 'retrieve')
+    cache_timeout = None
+    # Whether responses differ between authenticated users.
+    cache_per_user = False
+
+    def get_cache_tags(self):
+        return ()
+
+    def get_last_modified(self):
+        """Return when the data of the current action last changed."""
+        return None
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+    def get_cache_key(self, request):
+        if not request.user.is_authenticated:
+            visibility = 'anon'
+        elif self.cache_per_user:
+            visibility = f'user:{request.user.pk}'
+        else:
+            visibility = 'auth'
+        params = sorted(request.query_params.lists())
+        versions = get_tag_versions(self.get_cache_tags())
+        raw = f'{visibility}:{request.path}:{params}:{versions}'
+        return 'api:response:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cache_actions:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            # Read before the data, so that a change in between can only
+            # make the reported time too old, never too new.
+            last_modified = self.get_last_modified()
+            if not_modified_since(request, last_modified):
+                return self.not_modified(None, last_modified)
+            response = handler(request, *args, **kwargs)
+            if (not isinstance(response, Response)
+                    or response.status_code != status.HTTP_200_OK):
+                return response
+            etag = get_etag(response.data)
+            cache.set(key, (etag, last_modified, response.data),
+                      self.get_cache_timeout())
+        else:
+            etag, last_modified, data = entry
+            response = Response(data)
+        etag = get_representation_etag(etag, request)
+        if (etag_matches(request, etag)
+                or not_modified_since(request, last_modified)):
+            return self.not_modified(etag, last_modified)
+        return self.set_validators(response, etag, last_modified)
+
+    def not_modified(self, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        return self.set_validators(response, etag, last_modified)
+
+    def set_validators(self, response, etag, last_modified):
+        if etag is not None:
+            response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
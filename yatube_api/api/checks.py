@@ -0,0 +1,20 @@
+"""System checks of the API settings."""
+from django.conf import settings
+from django.core import checks
+
+from .cache import get_cache, is_shared
+
+
+@checks.register(checks.Tags.caches)
+def check_replica_pins(app_configs, **kwargs):
+    if not getattr(settings, 'DATABASE_REPLICAS', ()) or is_shared(
+            get_cache()):
+        return []
+    return [checks.Warning(
+        'Read replicas are configured, but API_CACHE_ALIAS is a '
+        'process-local cache.',
+        hint='Users are pinned to the primary after a write only in the '
+             'process that handled the write; configure a shared cache '
+             'backend such as memcached or the database cache.',
+        id='api.W001',
+    )]
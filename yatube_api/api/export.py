@@ -0,0 +1,69 @@
+"""Streaming NDJSON export of list endpoints.
+
+The export reads `.values()` projections through `.iterator()`, so memory
+stays flat whatever the size of the table, and writes one JSON object per
+line in the shape the regular serializer produces. Rows are read from the
+database the request was routed to (see `api.replicas`).
+"""
+import itertools
+
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+
+from .fast_serializers import get_values_serializer
+from .instrumentation import registry
+from .middleware import (get_view_name, measure_serialization,
+                         recording_queries)
+from .renderers import NDJSONRenderer
+from .replicas import read_alias, reading_from
+
+
+class NDJSONExportMixin:
+    """Streams the list action when NDJSON is requested."""
+
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [
+        NDJSONRenderer]
+    export_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != NDJSONRenderer.format:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_rows(queryset, read_alias.get()),
+            content_type=NDJSONRenderer.media_type
+        )
+
+    def iter_items(self, queryset):
+        values_serializer = get_values_serializer(
+            self.get_serializer_class(), self.get_field_names())
+        if values_serializer is None:
+            for instance in queryset.iterator(
+                    chunk_size=self.export_chunk_size):
+                yield self.get_serializer(instance).data
+            return
+        context = self.get_serializer_context()
+        rows = queryset.values(*values_serializer.lookups).iterator(
+            chunk_size=self.export_chunk_size)
+        for row in rows:
+            yield values_serializer.to_representation(row, context)
+
+    def stream_rows(self, queryset, alias):
+        items = self.iter_items(queryset)
+        timing = getattr(self.request, 'timing', None)
+        while True:
+            # The body is streamed after `finalize_response()` has reset
+            # the alias of the request and after the instrumentation has
+            # stopped counting queries, so every chunk enters both again.
+            with reading_from(alias), recording_queries(timing):
+                with measure_serialization(self.request):
+                    chunk = [
+                        NDJSONRenderer.render_line(item) for item in
+                        itertools.islice(items, self.export_chunk_size)
+                    ]
+            if not chunk:
+                break
+            yield b''.join(chunk)
+        if timing is not None:
+            registry.record(get_view_name(self.request), {
+                'serialize_ms': timing.serialize_time * 1000})
@@ -0,0 +1,145 @@
+"""Serialization of list pages straight from `.values()` rows.
+
+`ValuesSerializer` walks the fields of a regular serializer once and
+compiles every field into a `.values()` lookup and a converter, then turns
+rows into the same output the regular serializer produces for model
+instances, without building model instances or running per-field
+`to_representation` for plain values.
+"""
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .middleware import measure_serialization
+
+
+class UnsupportedField(Exception):
+    """Field that cannot be read from a `.values()` row."""
+
+
+PASS_THROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+
+
+def compile_file_field(field):
+    storage = field.parent.Meta.model._meta.get_field(field.source).storage
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def convert(value, context):
+        if not value:
+            return None
+        if not use_url:
+            return value
+        url = storage.url(value)
+        request = context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+    return convert
+
+
+def compile_field(field):
+    """Return the `.values()` lookup and the converter of `field`."""
+    if field.source == '*' or '.' in field.source:
+        raise UnsupportedField(field.field_name)
+    if hasattr(field, 'get_values_converter'):
+        return field.source, field.get_values_converter()
+    if isinstance(field, serializers.SlugRelatedField):
+        return f'{field.source}__{field.slug_field}', None
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        if field.pk_field is not None:
+            raise UnsupportedField(field.field_name)
+        return field.source, None
+    if isinstance(field, serializers.RelatedField):
+        raise UnsupportedField(field.field_name)
+    if isinstance(field, serializers.FileField):
+        return field.source, compile_file_field(field)
+    if isinstance(field, PASS_THROUGH_FIELDS):
+        return field.source, None
+    if isinstance(field, serializers.Field) and not hasattr(field, 'fields'):
+        return field.source, lambda value, context: field.to_representation(
+            value)
+    raise UnsupportedField(field.field_name)
+
+
+class ValuesSerializer:
+    """Serializes `.values()` rows like `serializer_class` serializes rows.
+
+    Only `field_names` are serialized when given. Raises
+    `UnsupportedField` when a field to serialize cannot be compiled.
+    """
+
+    def __init__(self, serializer_class, field_names=None):
+        self.plan = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (
+                    field_names is not None and name not in field_names):
+                continue
+            lookup, convert = compile_field(field)
+            self.plan.append((name, lookup, convert))
+        self.lookups = list(dict.fromkeys(
+            lookup for _, lookup, _ in self.plan))
+
+    def to_representation(self, row, context):
+        item = {}
+        for name, lookup, convert in self.plan:
+            value = row[lookup]
+            if convert is not None and value is not None:
+                value = convert(value, context)
+            item[name] = value
+        return item
+
+    def serialize(self, rows, context):
+        return [self.to_representation(row, context) for row in rows]
+
+
+_compiled = {}
+
+
+def get_values_serializer(serializer_class, field_names=None):
+    """Return the compiled `ValuesSerializer`, or None if unsupported."""
+    key = (serializer_class,
+           None if field_names is None else tuple(sorted(field_names)))
+    if key not in _compiled:
+        try:
+            _compiled[key] = ValuesSerializer(serializer_class, field_names)
+        except UnsupportedField:
+            _compiled[key] = None
+    return _compiled[key]
+
+
+class FastListMixin:
+    """Serializes list pages from `.values()` rows.
+
+    Enabled by the `API_FAST_LIST_SERIALIZERS` setting; views whose
+    serializer cannot be compiled keep the regular path. The view provides
+    `get_field_names()` and `get_extra_columns()`, as the sparse fieldsets
+    of `api.views.EagerLoadingQuerysetMixin` do.
+    """
+
+    def get_values_serializer(self):
+        if not getattr(settings, 'API_FAST_LIST_SERIALIZERS', False):
+            return None
+        return get_values_serializer(
+            self.get_serializer_class(), self.get_field_names())
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        if values_serializer is None:
+            return super().list(request, *args, **kwargs)
+        lookups = dict.fromkeys(
+            [*values_serializer.lookups, *self.get_extra_columns()])
+        queryset = self.filter_queryset(self.get_queryset()).values(*lookups)
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        with measure_serialization(request):
+            data = values_serializer.serialize(
+                queryset if page is None else page, context)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
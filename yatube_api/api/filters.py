@@ -0,0 +1,115 @@
+import datetime
+import sys
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from posts.search import search_posts
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """Full-text search of posts by `?search=`, best matches first.
+
+    Keyset pagination orders by date and would drop the ranking, so only
+    limit/offset pages can be combined with a search.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        use_keyset = getattr(view.paginator, 'use_keyset', None)
+        if use_keyset is not None and use_keyset(request):
+            raise ValidationError({self.search_param: [
+                'Search results cannot be paginated with `cursor`; '
+                'use `limit` and `offset`.'
+            ]})
+        return search_posts(queryset, text)
+
+
+def parse_moment(value):
+    """Parse an ISO 8601 datetime or date into an aware datetime."""
+    moment = parse_datetime(value)
+    if moment is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(value)
+        moment = datetime.datetime.combine(date, datetime.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class UsernamePrefixFilter(BaseFilterBackend):
+    """Case-insensitive username prefix search by `?search=`.
+
+    The prefix is case-folded and looked up as a range of the indexed
+    `username_key_field` of the view, so the search never scans the table.
+    The range assumes keys sort by code point, which is why the column has
+    the "C" collation on PostgreSQL.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        prefix = request.query_params.get(self.search_param, '').strip()
+        if not prefix:
+            return queryset
+        field = getattr(view, 'username_key_field', 'username_key')
+        prefix = prefix.casefold()
+        # Every key starting with the prefix sorts before the prefix
+        # followed by the greatest code point.
+        return queryset.filter(**{
+            f'{field}__gte': prefix,
+            f'{field}__lt': prefix + chr(sys.maxunicode),
+        })
+
+
+class PostFilter(BaseFilterBackend):
+    """Filters posts by `?group=<slug>`, `?author=<username>` and by
+    publication date with `?since=` and `?until=`.
+
+    Dates are ISO 8601 datetimes or dates; `since` is inclusive and
+    `until` is exclusive. Filtered timelines are newest first, the way
+    keyset pages are ordered, so limit/offset pages are stable too.
+    """
+
+    ordering = ('-pub_date', '-id')
+
+    lookups = {
+        'group': 'group__slug',
+        'author': 'author__username',
+    }
+    date_lookups = {
+        'since': 'pub_date__gte',
+        'until': 'pub_date__lt',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        conditions = {}
+        for param, lookup in self.lookups.items():
+            value = request.query_params.get(param)
+            if value:
+                conditions[lookup] = value
+        errors = {}
+        for param, lookup in self.date_lookups.items():
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                conditions[lookup] = parse_moment(value)
+            except ValueError:
+                errors[param] = ['Enter a valid date or datetime.']
+        if errors:
+            raise ValidationError(errors)
+        if not conditions:
+            return queryset
+        queryset = queryset.filter(**conditions)
+        use_keyset = getattr(view.paginator, 'use_keyset', None)
+        if use_keyset is None or not use_keyset(request):
+            queryset = queryset.order_by(*self.ordering)
+        return queryset
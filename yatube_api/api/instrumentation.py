@@ -0,0 +1,92 @@
+"""In-process histograms of per-request timings.
+
+`registry` aggregates what `api.middleware.InstrumentationMiddleware`
+measures, per view and action, until the process exits; `pools` holds the
+checkout timings of pooled database connections, per database alias.
+"""
+import bisect
+import threading
+
+TIME_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+METRIC_BUCKETS = {
+    'total_ms': TIME_BUCKETS,
+    'db_ms': TIME_BUCKETS,
+    'app_ms': TIME_BUCKETS,
+    'serialize_ms': TIME_BUCKETS,
+    'render_ms': TIME_BUCKETS,
+    'queries': COUNT_BUCKETS,
+    'response_bytes': SIZE_BUCKETS,
+}
+
+POOL_METRIC_BUCKETS = {
+    'wait_ms': TIME_BUCKETS,
+    'connect_ms': TIME_BUCKETS,
+    'in_use': COUNT_BUCKETS,
+}
+
+
+class Histogram:
+    """Counts of observations at or below each bucket bound."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'max': round(self.max, 3),
+            'buckets': dict(zip(bounds, self.counts)),
+        }
+
+
+class Registry:
+    """Histograms of every metric per view."""
+
+    def __init__(self, metric_buckets=METRIC_BUCKETS):
+        self.metric_buckets = metric_buckets
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view, metrics):
+        with self.lock:
+            histograms = self.views.setdefault(view, {
+                name: Histogram(buckets)
+                for name, buckets in self.metric_buckets.items()
+            })
+            for name, value in metrics.items():
+                if value is not None:
+                    histograms[name].observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view: {
+                    name: histogram.as_dict()
+                    for name, histogram in histograms.items()
+                }
+                for view, histograms in sorted(self.views.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+registry = Registry()
+pools = Registry(POOL_METRIC_BUCKETS)
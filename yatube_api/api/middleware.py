@@ -0,0 +1,135 @@
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+from .instrumentation import registry
+
+
+class RequestTiming:
+    """Timings of one request, in seconds."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view_start = None
+        self.view_end = None
+        self.render_end = None
+        self.queries = 0
+        self.db_time = 0
+        self.db_time_in_view = 0
+        self.serialize_time = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+            if self.view_start is not None and self.view_end is None:
+                self.db_time_in_view += elapsed
+
+
+@contextmanager
+def recording_queries(timing):
+    """Count the queries of the block in `timing`, unless it is None."""
+    with ExitStack() as stack:
+        if timing is not None:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timing.record_query))
+        yield
+
+
+@contextmanager
+def measure_serialization(request):
+    """Count the block, less its queries, as serialization of `request`.
+
+    Does nothing unless the instrumentation is enabled.
+    """
+    timing = getattr(request, 'timing', None)
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    db_time = timing.db_time
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start - (timing.db_time - db_time)
+        timing.serialize_time += max(elapsed, 0)
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method)
+    return f'{match.view_name}:{action}'
+
+
+class InstrumentationMiddleware:
+    """Measures queries, DB time, view time and rendering per request.
+
+    The measurements go out in the `Server-Timing` header and into the
+    in-process histograms of `api.instrumentation.registry`. Views report
+    the time spent turning objects into primitive data through
+    `measure_serialization` as `serialize`; the rest of the time in the
+    view outside the database (authentication, permissions, filtering,
+    pagination, cache lookups) is reported as `app`. Streamed responses
+    are serialized after this middleware has returned, so their
+    `serialize` time is recorded on its own when the stream ends.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        request.timing = timing
+        with recording_queries(timing):
+            response = self.get_response(request)
+        end = time.perf_counter()
+
+        view_end = timing.view_end or end
+        render = (timing.render_end or view_end) - view_end
+        app = 0
+        if timing.view_start is not None:
+            app = max(view_end - timing.view_start - timing.db_time_in_view
+                      - timing.serialize_time, 0)
+        size = None if response.streaming else len(response.content)
+        metrics = {
+            'total_ms': (end - timing.start) * 1000,
+            'db_ms': timing.db_time * 1000,
+            'app_ms': app * 1000,
+            # Recorded when the stream ends, see `api.export`.
+            'serialize_ms': (None if response.streaming
+                             else timing.serialize_time * 1000),
+            'render_ms': render * 1000,
+            'queries': timing.queries,
+            'response_bytes': size,
+        }
+        registry.record(get_view_name(request), metrics)
+        response['Server-Timing'] = ', '.join(
+            '{};dur={:.2f}{}'.format(name, metrics[f'{name}_ms'], suffix)
+            for name, suffix in (
+                ('db', f';desc="{timing.queries} queries"'),
+                ('app', ''), ('serialize', ''), ('render', ''), ('total', ''),
+            )
+            if metrics[f'{name}_ms'] is not None
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = request.timing
+        timing.view_end = time.perf_counter()
+
+        def finish_render(response):
+            timing.render_end = time.perf_counter()
+        response.add_post_render_callback(finish_render)
+        return response
@@ -0,0 +1,197 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       _positive_int)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from posts import feed
+
+
+class KeysetPagination(BasePagination):
+    """Paginates by seeking past the last row of the previous page.
+
+    `ordering` must identify a row uniquely and all of its fields share
+    one direction, so a page is an index range read whatever its depth.
+    """
+
+    ordering = ('-pk',)
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = ordering
+
+    @property
+    def descending(self):
+        return self.ordering[0].startswith('-')
+
+    @property
+    def field_names(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position))
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_seek_filter(self, position):
+        lookup = 'lt' if self.descending else 'gt'
+        seek = Q()
+        for index, name in enumerate(self.field_names):
+            condition = Q(**{f'{name}__{lookup}': position[index]})
+            for previous, value in zip(self.field_names, position[:index]):
+                condition &= Q(**{previous: value})
+            seek |= condition
+        return seek
+
+    def get_position(self, row):
+        values = []
+        for name in self.field_names:
+            if isinstance(row, dict):
+                value = row[name]
+            else:
+                value = getattr(row, 'pk' if name == 'pk' else
+                                row._meta.get_field(name).attname)
+            values.append(value)
+        return values
+
+    def encode_cursor(self, position):
+        payload = json.dumps(
+            [value.isoformat() if hasattr(value, 'isoformat') else value
+             for value in position]
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.field_names):
+                raise ValueError
+            return [
+                model._meta.pk.to_python(value) if name == 'pk' else
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.field_names, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'results': schema,
+            },
+        }
+
+
+class KeysetOrLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination with an opt-in keyset mode.
+
+    Requests with `limit` keep the limit/offset contract, requests with
+    `cursor` (empty for the first page) are paginated by `ordering`.
+    """
+
+    ordering = ('-pk',)
+    keyset_pagination_class = KeysetPagination
+
+    def use_keyset(self, request):
+        return (
+            self.limit_query_param not in request.query_params
+            and self.keyset_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_pagination_class(self.ordering)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class PostPagination(KeysetOrLimitOffsetPagination):
+    """Newest posts first in keyset mode."""
+
+    ordering = ('-pub_date', '-id')
+
+
+class CommentPagination(KeysetOrLimitOffsetPagination):
+    """Oldest comments first in keyset mode."""
+
+    ordering = ('created', 'id')
+
+
+class ProfilePagination(KeysetPagination):
+    """Users by case-folded username, a range of the username index."""
+
+    ordering = ('username_key', 'pk')
+
+
+class FeedPagination(KeysetPagination):
+    """Pages through the home feed of the requesting user."""
+
+    ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, queryset.model)
+        post_ids = feed.get_feed_page(
+            request.user, position, self.page_size + 1)
+        posts = queryset.in_bulk(post_ids)
+        rows = [posts[post_id] for post_id in post_ids if post_id in posts]
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
@@ -0,0 +1,67 @@
+import io
+
+import cbor2
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def reject_extension(code, data):
+    raise ValueError(f'unsupported extension type {code}')
+
+
+def reject_timestamps(values):
+    """Raise if any of `values` is a timestamp, the extension type -1.
+
+    msgpack decodes timestamps itself rather than passing them to the
+    `ext_hook`, so containers are checked as they are built.
+    """
+    for value in values:
+        if isinstance(value, msgpack.Timestamp):
+            raise ValueError('unsupported extension type -1')
+
+
+class MessagePackParser(BaseParser):
+    """Parses MessagePack request bodies.
+
+    Only the types JSON has are accepted: extension types, timestamps
+    included, are a parse error.
+    """
+
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            data = msgpack.unpackb(
+                stream.read(), ext_hook=reject_extension, timestamp=0,
+                list_hook=self.check_list, object_hook=self.check_map)
+            reject_timestamps([data])
+        except ValueError as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
+        return data
+
+    @staticmethod
+    def check_list(values):
+        reject_timestamps(values)
+        return values
+
+    @staticmethod
+    def check_map(values):
+        reject_timestamps(values.values())
+        return values
+
+
+class CBORParser(BaseParser):
+    """Parses CBOR request bodies."""
+
+    media_type = 'application/cbor'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        body = io.BytesIO(stream.read())
+        try:
+            data = cbor2.CBORDecoder(body).decode()
+        except cbor2.CBORDecodeError as exc:
+            raise ParseError(f'CBOR parse error - {exc}')
+        if body.read(1):
+            raise ParseError('CBOR parse error - extra data after the body')
+        return data
@@ -0,0 +1,67 @@
+import datetime
+import json
+
+import cbor2
+import msgpack
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+# Values the binary formats have no type for (dates, decimals, UUIDs, lazy
+# strings) are converted the way the JSON renderer converts them.
+to_primitive = encoders.JSONEncoder().default
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renders a list as newline delimited JSON, one item per line."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = data.get('results', [data])
+        return b''.join(self.render_line(item) for item in data)
+
+    @staticmethod
+    def render_line(item):
+        line = json.dumps(item, cls=encoders.JSONEncoder, ensure_ascii=False,
+                          separators=(',', ':'))
+        return line.encode() + b'\n'
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders data as MessagePack."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=to_primitive)
+
+
+class CBORRenderer(BaseRenderer):
+    """Renders data as CBOR (RFC 8949)."""
+
+    media_type = 'application/cbor'
+    format = 'cbor'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Dates, decimals and UUIDs keep their CBOR tags; the serializers
+        # turn them into strings before they get here anyway.
+        return cbor2.dumps(data, default=self.encode_default,
+                           timezone=datetime.timezone.utc)
+
+    @staticmethod
+    def encode_default(encoder, value):
+        encoder.encode(to_primitive(value))
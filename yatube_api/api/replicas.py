@@ -0,0 +1,182 @@
+"""Routing of read-only API requests to database replicas.
+
+Safe requests handled by the API viewsets read from one of the
+`DATABASE_REPLICAS` aliases, picked round-robin among the replicas that
+passed their last health check; everything else, and every write, uses
+`default`. Replicas are checked at most every
+`DATABASE_REPLICA_CHECK_SECONDS`, and taken out of the rotation as soon as
+a read from them fails to connect. After a user writes, their reads stay
+on `default` for `DATABASE_REPLICA_PIN_SECONDS`, so they see their own
+changes while the replicas catch up. The pin is kept in the API cache,
+which has to be shared by all processes (see `api.checks`).
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import (DEFAULT_DB_ALIAS, DatabaseError, InterfaceError,
+                       OperationalError, connections)
+
+from .cache import get_cache
+
+# Alias the current request reads from, None for the default database.
+read_alias = ContextVar('read_alias', default=None)
+
+
+class ReplicaPool:
+    """Round-robin choice among the replicas that are up.
+
+    A replica that fails its health check, or a read, is skipped for
+    `DATABASE_REPLICA_RETRY_SECONDS` before it is tried again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+        self.down_until = {}
+        self.check_after = {}
+
+    def get_aliases(self):
+        return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+    def get_retry_seconds(self):
+        return getattr(settings, 'DATABASE_REPLICA_RETRY_SECONDS', 30)
+
+    def get_check_seconds(self):
+        return getattr(settings, 'DATABASE_REPLICA_CHECK_SECONDS', 10)
+
+    def is_up(self, alias):
+        with self.lock:
+            return self.down_until.get(alias, 0) <= time.monotonic()
+
+    def mark_down(self, alias):
+        with self.lock:
+            self.down_until[alias] = (
+                time.monotonic() + self.get_retry_seconds())
+            self.check_after.pop(alias, None)
+
+    def is_check_due(self, alias):
+        """Whether `alias` is due for a health check, claiming it if so."""
+        now = time.monotonic()
+        with self.lock:
+            if self.check_after.get(alias, 0) > now:
+                return False
+            self.check_after[alias] = now + self.get_check_seconds()
+            return True
+
+    def report_error(self, alias, error):
+        """Take `alias` out of the rotation if `error` is a lost connection."""
+        if alias is not None and isinstance(
+                error, (OperationalError, InterfaceError)):
+            self.mark_down(alias)
+
+    def check(self, alias):
+        """Whether `alias` can be connected to and its connection works."""
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+            usable = connection.is_usable()
+        except DatabaseError:
+            usable = False
+        if not usable:
+            connection.close()
+            self.mark_down(alias)
+        return usable
+
+    def choose(self):
+        """Return a healthy replica alias, or None to use the primary."""
+        aliases = [alias for alias in self.get_aliases() if self.is_up(alias)]
+        if not aliases:
+            return None
+        start = next(self.counter)
+        for offset in range(len(aliases)):
+            alias = aliases[(start + offset) % len(aliases)]
+            if not self.is_check_due(alias) or self.check(alias):
+                return alias
+        return None
+
+    def reset(self):
+        with self.lock:
+            self.down_until.clear()
+            self.check_after.clear()
+
+
+pool = ReplicaPool()
+
+
+def get_pin_key(user):
+    return f'api:replica:pin:{user.pk}'
+
+
+def pin_to_primary(user):
+    """Send the reads of `user` to the primary for a while."""
+    get_cache().set(get_pin_key(user), True,
+                    getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5))
+
+
+def is_pinned(user):
+    return user.is_authenticated and bool(get_cache().get(get_pin_key(user)))
+
+
+@contextmanager
+def reading_from(alias):
+    token = read_alias.set(alias)
+    try:
+        yield alias
+    except DatabaseError as error:
+        pool.report_error(alias, error)
+        raise
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Reads from the alias chosen for the current request."""
+
+    def db_for_read(self, model, **hints):
+        # Entries of a database cache hold tag versions and pins, which
+        # must not lag behind.
+        if model._meta.app_label == 'django_cache':
+            return DEFAULT_DB_ALIAS
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+
+class ReplicaRoutingMixin:
+    """Sends safe requests of a viewset to a replica.
+
+    Authentication runs before the choice, so a user who has just written
+    is kept on the primary; successful unsafe requests pin their user.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        alias = None
+        if request.method in ('GET', 'HEAD', 'OPTIONS') and not is_pinned(
+                request.user):
+            alias = pool.choose()
+        self.read_alias_token = read_alias.set(alias)
+        super().initial(request, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        pool.report_error(read_alias.get(), exc)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'read_alias_token', None)
+        if token is not None:
+            read_alias.reset(token)
+            self.read_alias_token = None
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,64 +1,267 @@
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator
 
-from posts.models import Comment, Follow, Group, Post, User
+from posts import follow_graph
+from posts.images import load_variants
+from posts.models import Comment, Follow, Group, Post, Profile, User
 
 
-class PostSerializer(serializers.ModelSerializer):
+class EagerLoadingMixin:
+    """Declares the relations a serializer touches.
+
+    `select_related_fields` maps a forward relation to the columns of the
+    related model that the serializer reads, `prefetch_related_fields`
+    lists reverse and many-to-many relations. The viewsets use
+    `setup_eager_loading` to fetch a whole page in a constant number of
+    queries and to load only the columns that end up in the response.
+
+    Passing `field_names` keeps only those fields of the serializer; the
+    eager loading then skips the columns and relations of the others.
+    """
+
+    select_related_fields = {}
+    prefetch_related_fields = ()
+
+    def __init__(self, *args, field_names=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if field_names is not None:
+            for name in set(self.fields) - set(field_names):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_readable_field_names(cls):
+        return [name for name, field in cls().fields.items()
+                if not field.write_only]
+
+    @classmethod
+    def get_sources(cls, field_names=None):
+        """Return the attributes the given serializer fields start from."""
+        return {field.source.split('.')[0]
+                for name, field in cls().fields.items()
+                if field_names is None or name in field_names}
+
+    @classmethod
+    def get_only_fields(cls, field_names=None, extra=()):
+        """Return the column list for `QuerySet.only()`.
+
+        `extra` names further columns to load, e.g. those a paginator
+        orders by.
+        """
+        cached = cls.__dict__.get('_only_fields')
+        if cached is None:
+            cached = cls._only_fields = {}
+        key = (None if field_names is None else tuple(sorted(field_names)),
+               tuple(extra))
+        if key not in cached:
+            model = cls.Meta.model
+            # Fields may read a foreign key by its attname, e.g. `author_id`.
+            concrete = {}
+            for field in model._meta.concrete_fields:
+                concrete[field.name] = concrete[field.attname] = field.name
+            only = {model._meta.pk.name}
+            for name in [*cls.get_sources(field_names), *extra]:
+                if name in concrete:
+                    only.add(concrete[name])
+            for relation in cls.get_select_related(field_names):
+                only.add(relation)
+                only.update(f'{relation}__{column}' for column
+                            in cls.select_related_fields[relation])
+            cached[key] = tuple(sorted(only))
+        return cached[key]
+
+    @classmethod
+    def get_select_related(cls, field_names=None):
+        if field_names is None:
+            return list(cls.select_related_fields)
+        sources = cls.get_sources(field_names)
+        return [relation for relation in cls.select_related_fields
+                if relation in sources]
+
+    @classmethod
+    def get_prefetch_related(cls, field_names=None):
+        if field_names is None:
+            return list(cls.prefetch_related_fields)
+        sources = cls.get_sources(field_names)
+        return [lookup for lookup in cls.prefetch_related_fields
+                if lookup.split('__')[0] in sources]
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, field_names=None, extra=()):
+        select_related = cls.get_select_related(field_names)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        prefetch_related = cls.get_prefetch_related(field_names)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset.only(*cls.get_only_fields(field_names, extra))
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """Inserts a validated batch with a single `bulk_create`.
+
+    Backends that cannot return primary keys from a bulk insert get them
+    by reading back the newest rows matching the `save()` arguments, so
+    the caller must run `save()` inside a transaction.
+    """
+
+    def save(self, **kwargs):
+        self.save_kwargs = kwargs
+        return super().save(**kwargs)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objects = model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data])
+        if objects and objects[0].pk is None:
+            pks = list(
+                model.objects.filter(**self.save_kwargs).order_by('-pk')
+                .values_list('pk', flat=True)[:len(objects)]
+            )
+            for obj, pk in zip(objects, reversed(pks)):
+                obj.pk = pk
+        return objects
+
+
+class ImageVariantsField(serializers.Field):
+    """Read-only map of variant names to the URLs of stored image variants.
+
+    `image_field` names the model field whose storage holds the variants.
+    """
+
+    def __init__(self, image_field='image', **kwargs):
+        self.image_field = image_field
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_values_converter(self):
+        """Return the converter the fast list serializers use."""
+        model = self.parent.Meta.model
+        storage = model._meta.get_field(self.image_field).storage
+
+        def convert(value, context):
+            request = context.get('request')
+            urls = {}
+            for name, stored in load_variants(value).items():
+                url = storage.url(stored)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[name] = url
+            return urls
+        return convert
+
+    def to_representation(self, value):
+        return self.get_values_converter()(value, self.context)
+
+
+class IsFollowingField(serializers.Field):
+    """Read-only flag telling whether the requesting user follows the
+    author, read from the follow graph.
+
+    The followed ids are looked up once per serializer context, so a page
+    of posts costs one lookup however many rows it has.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', 'author_id')
+        super().__init__(**kwargs)
+
+    def get_values_converter(self):
+        """Return the converter the fast list serializers use."""
+        def convert(value, context):
+            following = context.get('following_ids')
+            if following is None:
+                user = getattr(context.get('request'), 'user', None)
+                following = frozenset()
+                if user is not None and user.is_authenticated:
+                    following = follow_graph.get_following(user.pk)
+                context['following_ids'] = following
+            return value in following
+        return convert
+
+    def to_representation(self, value):
+        return self.get_values_converter()(value, self.context)
+
+
+class PostSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializes data when creating a post"""
 
+    select_related_fields = {'author': ('username',)}
+
     author = serializers.SlugRelatedField(slug_field='username',
                                           read_only=True)
+    image_variants = ImageVariantsField()
+    is_following = IsFollowingField()
 
     class Meta:
         fields = '__all__'
+        read_only_fields = ('comments_count',)
         model = Post
+        list_serializer_class = BulkCreateListSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializes data when creating a comment"""
 
+    select_related_fields = {'author': ('username',)}
+
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
 
     class Meta:
         fields = '__all__'
+        read_only_fields = ('post',)
         model = Comment
+        list_serializer_class = BulkCreateListSerializer
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializes data when creating a group"""
 
     class Meta:
         fields = '__all__'
+        read_only_fields = ('posts_count', 'last_post_at')
         model = Group
 
 
-class FollowSerializer(serializers.ModelSerializer):
+class ProfileSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    """Serializes a user in the lists of followers and followed authors"""
+
+    select_related_fields = {'user': ('username',)}
+
+    username = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        fields = ('username', 'followers_count', 'following_count')
+        model = Profile
+
+
+class FollowSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializes data when creating a subscription"""
 
+    select_related_fields = {
+        'user': ('username',),
+        'following': ('username',),
+    }
+
     user = serializers.SlugRelatedField(
         read_only=True, slug_field='username',
         default=serializers.CurrentUserDefault()
     )
     following = serializers.SlugRelatedField(
-        queryset=User.objects.all(),
+        queryset=User.objects.only('id', 'username'),
         slug_field='username',
     )
 
     class Meta:
         fields = ('user', 'following')
         model = Follow
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Follow.objects.all(),
-                fields=['user', 'following']
-            )
-        ]
 
     def validate(self, data):
-        if self.context['request'].user == data['following']:
+        user = self.context['request'].user
+        if user == data['following']:
             raise serializers.ValidationError(
                 'Subscribe to yourself is not possible!')
+        # Duplicates are rejected by the unique constraint, see
+        # `FollowViewSet.perform_create`.
         return data
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.counters import group_stats_changed
+from posts.images import variants_ready
+from posts.models import Comment, Follow, Group, Post, User
+from .authentication import forget_user
+from .cache import bump_tags
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    bump_tags('posts', f'post:{instance.pk}')
+
+
+@receiver(variants_ready, sender=Post)
+def invalidate_post_images(sender, post_id, **kwargs):
+    bump_tags('posts', f'post:{post_id}')
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    bump_tags(f'post:{instance.post_id}', f'comments:post:{instance.post_id}')
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    bump_tags('groups')
+
+
+@receiver(group_stats_changed, sender=Group)
+def invalidate_group_stats(sender, group_ids, **kwargs):
+    bump_tags('groups')
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def invalidate_follow(sender, instance, **kwargs):
+    bump_tags(f'follows:{instance.user_id}')
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
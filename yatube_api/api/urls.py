@@ -1,7 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import CommentViewSet, FollowViewSet, PostViewSet, GroupViewSet
+from .views import (CommentViewSet, FeedViewSet, FollowersViewSet,
+                    FollowingViewSet, FollowViewSet, GroupViewSet, MetricsView,
+                    PostViewSet)
 
 app_name = 'api'
 
@@ -9,9 +11,15 @@ router = DefaultRouter()
 router.register(r'posts', PostViewSet, basename='posts')
 router.register(r'groups', GroupViewSet, basename='groups')
 router.register(r'follow', FollowViewSet, basename='follow')
+router.register(r'feed', FeedViewSet, basename='feed')
+router.register(r'users/(?P<username>[\w.@+-]+)/followers',
+                FollowersViewSet, basename='followers')
+router.register(r'users/(?P<username>[\w.@+-]+)/following',
+                FollowingViewSet, basename='following')
 router.register(r'posts/(?P<post_id>\d+)/comments',
                 CommentViewSet, basename='comments')
 urlpatterns = [
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
     path('v1/', include(router.urls)),
     path('v1/', include('djoser.urls')),
     path('v1/', include('djoser.urls.jwt')),
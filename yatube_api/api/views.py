@@ -1,34 +1,230 @@
-from django.shortcuts import get_object_or_404
-from rest_framework import filters, mixins, permissions, viewsets
-from rest_framework.pagination import LimitOffsetPagination
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from posts.models import Follow, Group, Post
+from posts import counters, feed, images
+from posts.models import Comment, Follow, Group, Post, Profile, User
+from .cache import CachedResponseMixin, bump_tags, get_cache, is_shared
+from .export import NDJSONExportMixin
+from .fast_serializers import FastListMixin
+from .filters import PostFilter, PostSearchFilter, UsernamePrefixFilter
+from .instrumentation import pools, registry
+from .middleware import measure_serialization
+from .pagination import (CommentPagination, FeedPagination, PostPagination,
+                         ProfilePagination)
 from .permissions import IsAuthorOrReadOnlyPermission
+from .replicas import ReplicaRoutingMixin
 from .serializers import (CommentSerializer, FollowSerializer, GroupSerializer,
-                          PostSerializer)
+                          PostSerializer, ProfileSerializer)
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class EagerLoadingQuerysetMixin:
+    """Applies the serializer's declared eager loading to the queryset.
+
+    Safe requests may ask for a subset of the fields with `?fields=` or
+    leave some out with `?exclude=` (comma-separated names); the queryset
+    then loads only the columns and relations those fields read.
+    """
+
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+
+    def get_requested_names(self, param):
+        value = self.request.query_params.get(param, '')
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def get_field_names(self):
+        """Return the names of the fields to serialize, None for all."""
+        if not hasattr(self, '_field_names'):
+            self._field_names = None
+            if self.request.method in permissions.SAFE_METHODS:
+                self._field_names = self.select_field_names()
+        return self._field_names
+
+    def select_field_names(self):
+        fields = self.get_requested_names(self.fields_query_param)
+        exclude = self.get_requested_names(self.exclude_query_param)
+        if not fields and not exclude:
+            return None
+        readable = self.get_serializer_class().get_readable_field_names()
+        errors = {}
+        for param, names in ((self.fields_query_param, fields),
+                             (self.exclude_query_param, exclude)):
+            unknown = [name for name in names if name not in readable]
+            if unknown:
+                errors[param] = [f'Unknown fields: {", ".join(unknown)}.']
+        if errors:
+            raise ValidationError(errors)
+        return tuple(
+            name for name in readable
+            if (not fields or name in fields) and name not in exclude
+        )
+
+    def get_extra_columns(self):
+        """Return the columns the paginator orders by."""
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        return tuple(name.lstrip('-') for name in ordering)
+
+    def get_serializer(self, *args, **kwargs):
+        field_names = self.get_field_names()
+        if field_names is not None:
+            kwargs.setdefault('field_names', field_names)
+        serializer = super().get_serializer(*args, **kwargs)
+        if args and 'data' not in kwargs:
+            # Serializers of instances are only read; producing the data
+            # here, where it is cached, measures it apart from the view.
+            with measure_serialization(self.request):
+                serializer.data
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return self.get_serializer_class().setup_eager_loading(
+            queryset, self.get_field_names(), self.get_extra_columns())
+
+
+class BulkCreateMixin:
+    """Creates every item of a JSON array in one transaction.
+
+    Validation errors are reported by the index of the item; nothing is
+    created unless the whole batch is valid.
+    """
+
+    def get_bulk_max_batch_size(self):
+        return getattr(settings, 'API_BULK_MAX_BATCH_SIZE', 1000)
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        max_batch_size = self.get_bulk_max_batch_size()
+        if len(request.data) > max_batch_size:
+            raise ValidationError({'non_field_errors': [
+                f'Ensure the batch has no more than {max_batch_size} items.'
+            ]})
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            raise ValidationError({
+                str(index): errors
+                for index, errors in enumerate(serializer.errors) if errors
+            })
+        with transaction.atomic():
+            self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
+
+
+class PostViewSet(ReplicaRoutingMixin,
+                  BulkCreateMixin,
+                  NDJSONExportMixin,
+                  CachedResponseMixin,
+                  FastListMixin,
+                  EagerLoadingQuerysetMixin,
+                  viewsets.ModelViewSet):
     """Have all functionality for creating, editing and delleting a post."""
 
     queryset = Post.objects.all()
     serializer_class = PostSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = PostPagination
     permission_classes = (IsAuthorOrReadOnlyPermission,)
+    filter_backends = (PostFilter, PostSearchFilter)
+    cache_actions = ('retrieve',)
+    cache_per_user = True
+
+    def get_cache_tags(self):
+        tags = (f'post:{self.kwargs[self.lookup_field]}',)
+        if self.request.user.is_authenticated:
+            tags += (f'follows:{self.request.user.pk}',)
+        return tags
+
+    def get_last_modified(self):
+        # Following the author changes `is_following` without moving
+        # `updated`, so responses to users are validated by ETag only.
+        if self.request.user.is_authenticated:
+            return None
+        return Post.objects.filter(
+            pk=self.kwargs[self.lookup_field]
+        ).values_list('updated', flat=True).first()
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        with transaction.atomic():
+            post = serializer.save(author=self.request.user)
+            counters.add_group_posts([post])
+        feed.fan_out_posts([post])
+        images.schedule(post)
+
+    def perform_update(self, serializer):
+        old_group_id = serializer.instance.group_id
+        with transaction.atomic():
+            if 'image' not in serializer.validated_data:
+                post = serializer.save()
+            else:
+                old_image = serializer.instance.image.name
+                old_variants = serializer.instance.image_variants
+                post = serializer.save(image_variants='')
+                images.release(old_image, old_variants)
+                images.schedule(post)
+            if post.group_id != old_group_id:
+                counters.remove_group_post(old_group_id)
+                counters.add_group_posts([post])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            counters.remove_group_post(instance.group_id)
+            images.release(instance.image.name, instance.image_variants)
+
+    def perform_bulk_create(self, serializer):
+        posts = serializer.save(author=self.request.user)
+        counters.add_group_posts(posts)
+        feed.fan_out_posts(posts)
+
+
+class FeedViewSet(ReplicaRoutingMixin,
+                  EagerLoadingQuerysetMixin,
+                  mixins.ListModelMixin,
+                  viewsets.GenericViewSet):
+    """Lists posts of the followed authors, newest first."""
+
+    queryset = Post.objects.all()
+    serializer_class = PostSerializer
+    pagination_class = FeedPagination
+    permission_classes = (permissions.IsAuthenticated,)
 
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+class GroupViewSet(ReplicaRoutingMixin,
+                   CachedResponseMixin,
+                   EagerLoadingQuerysetMixin,
+                   viewsets.ReadOnlyModelViewSet):
     """Have all functionality for creating, editing and delleting a group."""
 
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
+    filter_backends = (filters.OrderingFilter,)
+    ordering_fields = ('title', 'posts_count', 'last_post_at')
+    ordering = ('id',)
+
+    def get_cache_tags(self):
+        return ('groups',)
 
+    def get_cache_timeout(self):
+        # Every change to the catalog bumps the tag, so entries may live
+        # as long as they are not evicted, unless other processes never
+        # see the bumps of this one.
+        if not is_shared(get_cache()):
+            return super().get_cache_timeout()
+        return getattr(settings, 'API_GROUP_CACHE_TIMEOUT', 24 * 60 * 60)
 
-class FollowViewSet(mixins.ListModelMixin,
+
+class FollowViewSet(ReplicaRoutingMixin,
+                    EagerLoadingQuerysetMixin,
+                    mixins.ListModelMixin,
                     mixins.CreateModelMixin,
+                    mixins.DestroyModelMixin,
                     viewsets.GenericViewSet):
     """Have all functionality for creating and delleting a subscription."""
 
@@ -36,27 +232,187 @@ class FollowViewSet(mixins.ListModelMixin,
     permission_classes = (permissions.IsAuthenticated,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('following__username',)
+    lookup_field = 'following__username'
+    lookup_url_kwarg = 'username'
+    lookup_value_regex = r'[\w.@+-]+'
 
     def get_queryset(self):
         return Follow.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        try:
+            with transaction.atomic():
+                follow = serializer.save(user=self.request.user)
+                counters.change_follow_counts(follow, 1)
+        except IntegrityError:
+            raise ValidationError(
+                {'non_field_errors': [
+                    'You are already subscribed to this author.']})
+        feed.follow_added(follow)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            counters.change_follow_counts(instance, -1)
+        feed.follow_removed(instance)
+
+
+class RelatedUsersViewSet(ReplicaRoutingMixin,
+                          EagerLoadingQuerysetMixin,
+                          mixins.ListModelMixin,
+                          viewsets.GenericViewSet):
+    """Lists the users related by follows to the user in the URL.
 
+    Users are ordered by case-folded username and paginated by cursor;
+    `?search=` narrows the list to a username prefix.
+    """
 
-class CommentViewSet(viewsets.ModelViewSet):
-    """Have all functionality for creating, editing and delleting a comment."""
+    serializer_class = ProfileSerializer
+    pagination_class = ProfilePagination
+    filter_backends = (UsernamePrefixFilter,)
+    # Lookup from a profile to the username in the URL.
+    relation = None
+
+    def get_queryset(self):
+        return Profile.objects.filter(
+            **{self.relation: self.kwargs['username']})
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Only an empty page needs to tell an unknown user from one
+        # without follows.
+        if not response.data['results'] and not User.objects.filter(
+                username=self.kwargs['username']).exists():
+            raise NotFound()
+        return response
+
+
+class FollowersViewSet(RelatedUsersViewSet):
+    """Lists the followers of a user."""
+
+    relation = 'user__follower__following__username'
+
+
+class FollowingViewSet(RelatedUsersViewSet):
+    """Lists the authors a user follows."""
+
+    relation = 'user__following__user__username'
+
+
+class CommentViewSet(ReplicaRoutingMixin,
+                     BulkCreateMixin,
+                     NDJSONExportMixin,
+                     CachedResponseMixin,
+                     FastListMixin,
+                     EagerLoadingQuerysetMixin,
+                     viewsets.ModelViewSet):
+    """Have all functionality for creating, editing and delleting a comment.
+
+    Comments are read and written with a single statement filtered by the
+    post in the URL; a missing post is found by the comments counter
+    update on writes and by the Last-Modified read on uncached lists. A
+    list served from the cache only looks the post up when it is empty.
+    """
 
     serializer_class = CommentSerializer
+    pagination_class = CommentPagination
     permission_classes = (IsAuthorOrReadOnlyPermission,)
 
-    def get_queryset(self):
+    def get_cache_tags(self):
         post_id = self.kwargs.get('post_id')
-        post = get_object_or_404(Post, id=post_id)
-        new_queryset = post.comments.all()
-        return new_queryset
+        return (f'post:{post_id}', f'comments:post:{post_id}')
+
+    def get_last_modified(self):
+        if self.action != 'list':
+            return None
+        # Every change of a comment moves the `updated` time of its post.
+        updated = Post.objects.filter(
+            pk=self.get_post_id()
+        ).values_list('updated', flat=True).first()
+        if updated is None:
+            raise NotFound
+        self.post_exists = True
+        return updated
+
+    def get_post_id(self):
+        return int(self.kwargs['post_id'])
+
+    def get_queryset(self):
+        return Comment.objects.filter(
+            post_id=self.get_post_id()).order_by('created', 'id')
+
+    def check_post_exists(self):
+        if not Post.objects.filter(pk=self.get_post_id()).exists():
+            raise NotFound
+
+    def list(self, request, *args, **kwargs):
+        self.post_exists = False
+        response = super().list(request, *args, **kwargs)
+        if self.post_exists:
+            return response
+        if not isinstance(response, Response):
+            # A streamed export has not read any rows yet.
+            self.check_post_exists()
+        elif response.status_code == status.HTTP_200_OK:
+            data = response.data
+            if isinstance(data, dict):
+                data = data['results']
+            if not data:
+                self.check_post_exists()
+        return response
+
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except ValidationError:
+            # A missing post takes precedence over invalid items. Valid
+            # requests learn it from the counter update instead.
+            self.check_post_exists()
+            raise
+
+    def add_comments(self, serializer, count):
+        post_id = self.get_post_id()
+        if not counters.change_comments_count(post_id, count):
+            raise NotFound
+        return serializer.save(author=self.request.user, post_id=post_id)
 
     def perform_create(self, serializer):
-        post_id = self.kwargs.get('post_id')
-        post = get_object_or_404(Post, id=post_id)
-        serializer.save(author=self.request.user, post=post)
+        with transaction.atomic():
+            self.add_comments(serializer, 1)
+
+    def perform_bulk_create(self, serializer):
+        self.add_comments(serializer, len(serializer.validated_data))
+        post_id = self.get_post_id()
+        bump_tags(f'post:{post_id}', f'comments:post:{post_id}')
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            comment = serializer.save()
+            counters.touch_post(comment.post_id)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            counters.change_comments_count(instance.post_id, -1)
+
+
+class MetricsView(APIView):
+    """Shows the request timing histograms collected by this process.
+
+    Pooled database connections are listed as `pool:<alias>`.
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        snapshot = registry.snapshot()
+        snapshot.update(
+            (f'pool:{alias}', metrics)
+            for alias, metrics in pools.snapshot().items()
+        )
+        return Response(snapshot)
+
+    def delete(self, request):
+        registry.reset()
+        pools.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,192 @@
+"""Denormalized counters on posts and user profiles.
+
+The API updates the counters with `F()` expressions in the same
+transaction that creates or deletes the counted rows. Rows changed
+elsewhere (admin, shell, cascades) may leave drift behind, which the
+`recount` management command repairs.
+
+Changing the comments of a post also moves its `updated` timestamp, which
+the API reports as the Last-Modified time of the post and its comments.
+
+Groups count their posts and remember when the latest one was published;
+`group_stats_changed` is sent with the ids of the groups whose stats moved.
+
+`StoredFile` counts the posts using each file of the image storage as
+their image or as one of its variants.
+"""
+import json
+from collections import Counter, defaultdict
+
+from django.db.models import (Case, Count, F, OuterRef, Q, Subquery, Value,
+                              When)
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Comment, Follow, Group, Post, Profile, StoredFile, User
+
+# Sent with `group_ids` when the stats of groups have changed.
+group_stats_changed = Signal()
+
+
+def change_counter(queryset, field, delta, **changes):
+    """Add `delta` to `field`, never taking a drifted counter below zero.
+
+    `changes` are further field values written by the same UPDATE.
+    """
+    value = F(field) + delta
+    if delta < 0:
+        value = Case(When(**{f'{field}__gte': -delta}, then=value),
+                     default=Value(0))
+    return queryset.update(**{field: value}, **changes)
+
+
+def change_comments_count(post_id, delta):
+    """Return whether the post exists, i.e. whether a row was updated."""
+    return bool(change_counter(
+        Post.objects.filter(pk=post_id), 'comments_count', delta,
+        updated=timezone.now()
+    ))
+
+
+def touch_post(post_id):
+    """Mark the post as modified, e.g. after one of its comments changed."""
+    Post.objects.filter(pk=post_id).update(updated=timezone.now())
+
+
+def change_follow_counts(follow, delta):
+    change_counter(Profile.objects.filter(user_id=follow.following_id),
+                   'followers_count', delta)
+    change_counter(Profile.objects.filter(user_id=follow.user_id),
+                   'following_count', delta)
+
+
+def latest_post_subquery():
+    """Publication date of the latest post of the outer group."""
+    return Subquery(
+        Post.objects.filter(group=OuterRef('pk'))
+        .order_by('-pub_date').values('pub_date')[:1]
+    )
+
+
+def add_group_posts(posts):
+    """Count `posts`, new to their groups, in the stats of the groups."""
+    dates = defaultdict(list)
+    for post in posts:
+        if post.group_id is not None:
+            dates[post.group_id].append(post.pub_date)
+    for group_id, pub_dates in dates.items():
+        latest = max(pub_dates)
+        change_counter(
+            Group.objects.filter(pk=group_id), 'posts_count', len(pub_dates),
+            last_post_at=Case(
+                When(Q(last_post_at__isnull=True)
+                     | Q(last_post_at__lt=latest), then=Value(latest)),
+                default=F('last_post_at'),
+            )
+        )
+    if dates:
+        group_stats_changed.send(sender=Group, group_ids=list(dates))
+
+
+def remove_group_post(group_id):
+    """Uncount a post deleted from, or moved out of, the group."""
+    if group_id is None:
+        return
+    change_counter(Group.objects.filter(pk=group_id), 'posts_count', -1,
+                   last_post_at=latest_post_subquery())
+    group_stats_changed.send(sender=Group, group_ids=[group_id])
+
+
+def count_subquery(queryset, field):
+    counts = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(total=Count('*'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def repair(queryset, counters):
+    """Rewrite `counters` ({field: expression}) of rows that drifted.
+
+    Returns the number of repaired rows.
+    """
+    repaired = 0
+    for field, expression in counters.items():
+        drifted = (
+            queryset.annotate(actual=expression)
+            .exclude(Q(**{field: F('actual')})
+                     | Q(**{f'{field}__isnull': True, 'actual__isnull': True}))
+            .values_list('pk', flat=True)
+        )
+        drifted = list(drifted)
+        if drifted:
+            queryset.filter(pk__in=drifted).update(**{field: expression})
+        repaired += len(drifted)
+    return repaired
+
+
+def repair_username_keys():
+    """Rewrite the username keys of profiles whose user was renamed."""
+    repaired = 0
+    rows = Profile.objects.values_list('pk', 'user__username', 'username_key')
+    for pk, username, username_key in rows.iterator():
+        expected = Profile.get_username_key(username)
+        if username_key != expected:
+            Profile.objects.filter(pk=pk).update(username_key=expected)
+            repaired += 1
+    return repaired
+
+
+def repair_stored_files():
+    """Rewrite the reference counts of stored files that drifted."""
+    references = Counter()
+    rows = Post.objects.values_list('image', 'image_variants')
+    for image, variants in rows.iterator():
+        if image:
+            references[image] += 1
+        references.update(json.loads(variants).values() if variants else ())
+    repaired = 0
+    rows = StoredFile.objects.values_list('name', 'references')
+    for name, count in list(rows):
+        expected = references.pop(name, 0)
+        if expected != count:
+            StoredFile.objects.filter(name=name).update(references=expected)
+            repaired += 1
+    StoredFile.objects.bulk_create(
+        StoredFile(name=name, references=count)
+        for name, count in references.items()
+    )
+    return repaired + len(references)
+
+
+def recount():
+    """Recompute all counters, return {counter: number of repaired rows}."""
+    missing = User.objects.filter(profile__isnull=True)
+    created = len(Profile.objects.bulk_create(
+        Profile(user_id=pk, username_key=Profile.get_username_key(username))
+        for pk, username in missing.values_list('pk', 'username')
+    ))
+    groups = repair(Group.objects.all(), {
+        'posts_count': count_subquery(Post.objects.all(), 'group'),
+        'last_post_at': latest_post_subquery(),
+    })
+    if groups:
+        group_stats_changed.send(
+            sender=Group, group_ids=list(Group.objects.values_list(
+                'pk', flat=True)))
+    return {
+        'profiles created': created,
+        'profile username keys': repair_username_keys(),
+        'group posts': groups,
+        'stored files': repair_stored_files(),
+        'post comments': repair(Post.objects.all(), {
+            'comments_count': count_subquery(Comment.objects.all(), 'post'),
+        }),
+        'profile follows': repair(Profile.objects.all(), {
+            'followers_count': count_subquery(
+                Follow.objects.all(), 'following'),
+            'following_count': count_subquery(Follow.objects.all(), 'user'),
+        }),
+    }
@@ -0,0 +1,139 @@
+"""Home feed built from Follow relationships.
+
+Posts of regular authors are fanned out on write into the `FeedEntry`
+timeline of every follower, so reading a feed page is a range read over
+`(user, pub_date, post)`. Authors with `FEED_FANOUT_LIMIT` followers or
+more are not fanned out; their posts are merged into the page on read.
+When such an author drops below the limit, the timelines of the remaining
+followers are backfilled, since their posts are no longer merged.
+"""
+import heapq
+from itertools import groupby
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import FeedEntry, Follow, Post, Profile
+
+
+def get_fanout_limit():
+    return getattr(settings, 'FEED_FANOUT_LIMIT', 1000)
+
+
+def get_backfill_size():
+    return getattr(settings, 'FEED_BACKFILL_SIZE', 100)
+
+
+def get_followers_count(author_id):
+    return (
+        Profile.objects.filter(user_id=author_id)
+        .values_list('followers_count', flat=True).first() or 0
+    )
+
+
+def get_pulled_authors(user):
+    """Return ids of authors followed by `user` that are merged on read."""
+    return list(
+        Follow.objects.filter(
+            user=user,
+            following__profile__followers_count__gte=get_fanout_limit()
+        ).values_list('following_id', flat=True)
+    )
+
+
+def fan_out_posts(posts):
+    """Copy new posts into the timelines of their authors' followers."""
+    posts = sorted(posts, key=lambda post: post.author_id)
+    entries = []
+    for author_id, author_posts in groupby(posts,
+                                           key=lambda post: post.author_id):
+        if get_followers_count(author_id) >= get_fanout_limit():
+            continue
+        followers = list(
+            Follow.objects.filter(following_id=author_id)
+            .values_list('user_id', flat=True)
+        )
+        entries.extend(
+            FeedEntry(user_id=user_id, post_id=post.id,
+                      pub_date=post.pub_date)
+            for post in author_posts for user_id in followers
+        )
+    FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def backfill(author_id, user_ids):
+    """Copy recent posts of the author into the timelines of `user_ids`."""
+    recent = list(
+        Post.objects.filter(author_id=author_id)
+        .order_by('-pub_date', '-id')
+        .values_list('id', 'pub_date')[:get_backfill_size()]
+    )
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+         for user_id in user_ids for post_id, pub_date in recent),
+        batch_size=1000, ignore_conflicts=True
+    )
+
+
+def follow_added(follow):
+    """Backfill the follower's timeline with recent posts of the author."""
+    if get_followers_count(follow.following_id) >= get_fanout_limit():
+        return
+    backfill(follow.following_id, [follow.user_id])
+
+
+def follow_removed(follow):
+    """Drop the author's posts from the former follower's timeline.
+
+    Called once the follow is deleted and counted out.
+    """
+    FeedEntry.objects.filter(
+        user_id=follow.user_id, post__author_id=follow.following_id
+    ).delete()
+    if get_followers_count(follow.following_id) == get_fanout_limit() - 1:
+        # The author has just dropped below the limit: their posts are no
+        # longer merged on read, and those published meanwhile were never
+        # fanned out.
+        backfill(follow.following_id, Follow.objects.filter(
+            following_id=follow.following_id
+        ).values_list('user_id', flat=True))
+
+
+def get_feed_page(user, position=None, limit=20):
+    """Return ids of up to `limit` feed posts older than `position`.
+
+    `position` is the `(pub_date, id)` of the last post of the previous
+    page; posts are ordered newest first.
+    """
+    sources = [(
+        FeedEntry.objects.filter(user=user),
+        ('pub_date', 'post_id'),
+    )]
+    pulled = get_pulled_authors(user)
+    if pulled:
+        sources.append((
+            Post.objects.filter(author_id__in=pulled),
+            ('pub_date', 'id'),
+        ))
+
+    streams = []
+    for queryset, (date_field, id_field) in sources:
+        if position is not None:
+            pub_date, post_id = position
+            queryset = queryset.filter(
+                Q(**{f'{date_field}__lt': pub_date})
+                | Q(**{date_field: pub_date, f'{id_field}__lt': post_id})
+            )
+        streams.append(list(
+            queryset.order_by(f'-{date_field}', f'-{id_field}')
+            .values_list(date_field, id_field)[:limit]
+        ))
+
+    post_ids = []
+    for _, post_id in heapq.merge(*streams, reverse=True):
+        if post_ids and post_ids[-1] == post_id:
+            continue
+        post_ids.append(post_id)
+        if len(post_ids) == limit:
+            break
+    return post_ids
@@ -0,0 +1,145 @@
+"""Cached adjacency of the follow graph.
+
+The ids of the authors a user follows are kept as a frozenset in an
+in-process LRU cache and, packed into an integer array, in the shared
+cache (`FOLLOW_GRAPH_CACHE_ALIAS`). Each user has a version in the shared
+cache that follows and unfollows bump, so every process drops its copy on
+the next lookup. Membership checks for a whole page are a single lookup
+followed by set membership per row.
+
+In-process copies expire after `FOLLOW_GRAPH_LOCAL_TTL` seconds, which
+bounds how stale they get when the versions are not shared, e.g. with a
+process-local cache; the shared copies then expire as soon. Nothing that
+rejects a request relies on the graph.
+"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import Follow
+
+
+def get_cache():
+    return caches[getattr(settings, 'FOLLOW_GRAPH_CACHE_ALIAS', 'default')]
+
+
+def get_local_ttl():
+    return getattr(settings, 'FOLLOW_GRAPH_LOCAL_TTL', 5)
+
+
+def get_timeout():
+    timeout = getattr(settings, 'FOLLOW_GRAPH_CACHE_TIMEOUT', 3600)
+    if isinstance(get_cache(), LocMemCache):
+        # Other processes never see the version bumps of this one.
+        return min(timeout, get_local_ttl())
+    return timeout
+
+
+def get_version_key(user_id):
+    return f'follow-graph:version:{user_id}'
+
+
+def get_following_key(user_id, version):
+    return f'follow-graph:following:{user_id}:{version}'
+
+
+class LocalGraph:
+    """LRU of `user_id -> (version, expiry, frozenset of followed ids)`."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, version):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if (entry is None or entry[0] != version
+                    or entry[1] <= time.monotonic()):
+                return None
+            self.entries.move_to_end(user_id)
+            return entry[2]
+
+    def set(self, user_id, version, following):
+        max_size = getattr(settings, 'FOLLOW_GRAPH_LOCAL_SIZE', 10000)
+        expiry = time.monotonic() + get_local_ttl()
+        with self.lock:
+            self.entries[user_id] = (version, expiry, following)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local = LocalGraph()
+
+
+def get_version(user_id):
+    cache = get_cache()
+    key = get_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock, like the API cache tags, so that a version
+        # evicted from the cache never comes back with an old value.
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def pack(ids):
+    return array('q', sorted(ids)).tobytes()
+
+
+def unpack(packed):
+    ids = array('q')
+    ids.frombytes(packed)
+    return frozenset(ids)
+
+
+def get_following(user_id):
+    """Return the frozenset of ids of the authors `user_id` follows."""
+    version = get_version(user_id)
+    following = local.get(user_id, version)
+    if following is not None:
+        return following
+    cache = get_cache()
+    key = get_following_key(user_id, version)
+    packed = cache.get(key)
+    if packed is None:
+        following = frozenset(
+            Follow.objects.filter(user_id=user_id)
+            .values_list('following_id', flat=True)
+        )
+        cache.set(key, pack(following), get_timeout())
+    else:
+        following = unpack(packed)
+    local.set(user_id, version, following)
+    return following
+
+
+def is_following(user_id, author_id):
+    return author_id in get_following(user_id)
+
+
+def following_many(user_id, author_ids):
+    """Return `{author_id: bool}` for every id of `author_ids`."""
+    following = get_following(user_id)
+    return {author_id: author_id in following for author_id in author_ids}
+
+
+def invalidate(user_id):
+    """Drop every cached copy of the follows of `user_id`."""
+    cache = get_cache()
+    key = get_version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
@@ -0,0 +1,150 @@
+"""Resized variants of post images.
+
+Uploads are saved as they come; once the post is committed a local
+process pool renders the variants listed in `POST_IMAGE_VARIANTS` with
+Pillow and stores them next to the original under `posts/`. The names of
+the stored variants are kept in `Post.image_variants`, so the API can link
+to them without touching the disk. With `POST_IMAGE_PROCESSING_SYNC` the
+variants are rendered in the calling thread instead, e.g. in tests.
+
+The pool spawns its workers: forking a process that holds database
+connections and threads would share them with the children. Rendered
+variants are stored by a single thread of this process, fed through a
+queue, so the management thread of the pool never waits for the database
+or the storage.
+"""
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Post
+from .rendering import render_variants
+
+logger = logging.getLogger(__name__)
+
+# Sent with `post_id` when the variants of a post have been stored.
+variants_ready = Signal()
+
+DEFAULT_VARIANTS = {
+    'thumbnail': {'size': (320, 320), 'format': 'JPEG'},
+    'thumbnail_webp': {'size': (320, 320), 'format': 'WEBP'},
+    'medium_webp': {'size': (1280, 1280), 'format': 'WEBP'},
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+# Futures of rendered variants, with the post and image they belong to.
+_rendered = queue.Queue()
+_storer = None
+
+
+def get_variants():
+    return getattr(settings, 'POST_IMAGE_VARIANTS', DEFAULT_VARIANTS)
+
+
+def is_sync():
+    return getattr(settings, 'POST_IMAGE_PROCESSING_SYNC', False)
+
+
+def get_executor():
+    global _executor, _storer
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                getattr(settings, 'POST_IMAGE_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn'))
+        if _storer is None:
+            _storer = threading.Thread(
+                target=store_rendered, name='post-image-storer', daemon=True)
+            _storer.start()
+        return _executor
+
+
+def load_variants(value):
+    return json.loads(value) if value else {}
+
+
+def release(image_name, image_variants):
+    """Drop the references of a post to its image and variants.
+
+    Identical uploads share one file in the content-addressed storage, so
+    a file is only deleted, once the current transaction is committed,
+    with the last post that uses it.
+    """
+    names = list(load_variants(image_variants).values())
+    if image_name:
+        names.append(image_name)
+    Post._meta.get_field('image').storage.release(names)
+
+
+def store_variants(post_id, image_name, rendered):
+    """Save rendered variants and attach them to the post.
+
+    The variants are dropped again if the post was deleted or got another
+    image while they were being rendered.
+    """
+    field = Post._meta.get_field('image')
+    with transaction.atomic():
+        stored = {
+            name: field.storage.save(
+                field.generate_filename(None, f'{name}.{extension}'),
+                ContentFile(content))
+            for name, (extension, content) in rendered.items()
+        }
+        # Moving `updated` makes conditional requests see the variants.
+        updated = Post.objects.filter(pk=post_id, image=image_name).update(
+            image_variants=json.dumps(stored, sort_keys=True),
+            updated=timezone.now())
+        if not updated:
+            field.storage.release(stored.values())
+            return
+    variants_ready.send(sender=Post, post_id=post_id)
+
+
+def store_rendered():
+    """Store the variants rendered by the pool, one post at a time."""
+    while True:
+        post_id, image_name, future = _rendered.get()
+        close_old_connections()
+        try:
+            rendered = future.result()
+        except Exception:
+            logger.exception(
+                'Rendering the image variants of post %s failed', post_id)
+        else:
+            try:
+                store_variants(post_id, image_name, rendered)
+            except Exception:
+                logger.exception(
+                    'Storing the image variants of post %s failed', post_id)
+        finally:
+            close_old_connections()
+            _rendered.task_done()
+
+
+def process_image(post_id, image_name):
+    storage = Post._meta.get_field('image').storage
+    path = storage.path(image_name)
+    if is_sync():
+        store_variants(post_id, image_name,
+                       render_variants(path, get_variants()))
+        return
+    future = get_executor().submit(render_variants, path, get_variants())
+    future.add_done_callback(
+        lambda future: _rendered.put((post_id, image_name, future)))
+
+
+def schedule(post):
+    """Render the variants of the image of `post` once it is committed."""
+    if post.image:
+        image_name = post.image.name
+        transaction.on_commit(lambda: process_image(post.pk, image_name))
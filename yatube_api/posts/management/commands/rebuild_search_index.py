@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from posts.search import install_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to rebuild the index in.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        install_index(connection)
+        rebuild_index(connection)
+        self.stdout.write('Search index rebuilt.')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import recount
+
+
+class Command(BaseCommand):
+    help = 'Recompute comment and follower counters and repair drift.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            repaired = recount()
+        for counter, rows in repaired.items():
+            self.stdout.write(f'{counter}: {rows}')
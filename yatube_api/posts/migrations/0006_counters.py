@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Profile = apps.get_model('posts', 'Profile')
+    Post = apps.get_model('posts', 'Post')
+    users = User.objects.using(db_alias).annotate(
+        followers=models.Count('following', distinct=True),
+        followed=models.Count('follower', distinct=True),
+    )
+    Profile.objects.using(db_alias).bulk_create(
+        Profile(user_id=user.pk, followers_count=user.followers,
+                following_count=user.followed)
+        for user in users.iterator()
+    )
+    posts = Post.objects.using(db_alias)
+    for post in posts.annotate(
+            comments_total=models.Count('comments')).iterator():
+        if post.comments_total:
+            posts.filter(pk=post.pk).update(
+                comments_count=post.comments_total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0005_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Number of followers')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Number of followed authors')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Number of comments'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from posts.search import install_index, uninstall_index
+
+
+def create_index(apps, schema_editor):
+    install_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    uninstall_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:30
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Last modification of the post or its comments'),
+            preserve_default=False,
+        ),
+    ]
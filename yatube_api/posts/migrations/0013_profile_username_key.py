@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+def fill_username_keys(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Profile = apps.get_model('posts', 'Profile')
+    profiles = Profile.objects.using(db_alias)
+    rows = profiles.values_list('pk', 'user__username')
+    for pk, username in rows.iterator():
+        profiles.filter(pk=pk).update(username_key=username.casefold())
+
+
+def set_binary_collation(apps, schema_editor):
+    # Prefix searches compare keys by code point, like Python does.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE posts_profile ALTER COLUMN username_key '
+            'TYPE varchar(150) COLLATE "C"')
+
+
+def unset_binary_collation(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE posts_profile ALTER COLUMN username_key '
+            'TYPE varchar(150) COLLATE "default"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_comment_post_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='username_key',
+            field=models.CharField(default='', max_length=150, verbose_name='Case-folded username'),
+        ),
+        migrations.RunPython(fill_username_keys, migrations.RunPython.noop),
+        migrations.RunPython(set_binary_collation, unset_binary_collation),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['username_key', 'user'], name='posts_profile_username_key_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+def fill_group_stats(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    stats = (
+        Post.objects.using(db_alias).filter(group__isnull=False)
+        .values('group').annotate(total=models.Count('*'),
+                                  latest=models.Max('pub_date'))
+    )
+    groups = Group.objects.using(db_alias)
+    for row in stats.iterator():
+        groups.filter(pk=row['group']).update(
+            posts_count=row['total'], last_post_at=row['latest'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_profile_username_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='last_post_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Publication date of the latest post'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Number of posts'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
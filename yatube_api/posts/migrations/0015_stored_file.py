@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:00
+
+import json
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def fill_stored_files(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Post = apps.get_model('posts', 'Post')
+    StoredFile = apps.get_model('posts', 'StoredFile')
+    references = Counter()
+    rows = Post.objects.using(db_alias).values_list('image', 'image_variants')
+    for image, variants in rows.iterator():
+        if image:
+            references[image] += 1
+        references.update(json.loads(variants).values() if variants else ())
+    StoredFile.objects.using(db_alias).bulk_create(
+        StoredFile(name=name, references=count)
+        for name, count in references.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='Number of references')),
+            ],
+        ),
+        migrations.RunPython(fill_stored_files, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='posts_post_image_idx',
+        ),
+    ]
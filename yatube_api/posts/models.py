@@ -2,15 +2,48 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
 
+from .storage import post_images
+
 User = get_user_model()
 
 
+class Profile(models.Model):
+    """Counters maintained for a user"""
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='profile')
+    followers_count = models.PositiveIntegerField(
+        'Number of followers', default=0)
+    following_count = models.PositiveIntegerField(
+        'Number of followed authors', default=0)
+    # Collated "C" on PostgreSQL by migration 0013, for prefix ranges.
+    username_key = models.CharField(
+        'Case-folded username', max_length=150, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['username_key', 'user'],
+                         name='posts_profile_username_key_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.user)
+
+    @staticmethod
+    def get_username_key(username):
+        return username.casefold()
+
+
 class Group(models.Model):
     """Model for creating, editing and deleting a group"""
 
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField('Number of posts', default=0)
+    last_post_at = models.DateTimeField(
+        'Publication date of the latest post', blank=True, null=True)
 
     def __str__(self):
         return self.title
@@ -24,16 +57,43 @@ class Post(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='posts')
     image = models.ImageField(
-        upload_to='posts/', null=True, blank=True)
+        upload_to='posts/', storage=post_images, null=True, blank=True)
+    image_variants = models.TextField(
+        'Stored image variants (JSON)', blank=True, default='')
     group = models.ForeignKey(
         Group, on_delete=models.SET_NULL,
         related_name="posts", blank=True, null=True
     )
+    comments_count = models.PositiveIntegerField(
+        'Number of comments', default=0)
+    updated = models.DateTimeField(
+        'Last modification of the post or its comments', auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['pub_date', 'id'],
+                         name='posts_post_pub_date_id_idx'),
+            models.Index(fields=['group', 'pub_date'],
+                         name='posts_post_group_pub_date_idx'),
+            models.Index(fields=['author', 'pub_date'],
+                         name='posts_post_author_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
 
+class StoredFile(models.Model):
+    """Number of references to a file of the content-addressed storage"""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    references = models.PositiveIntegerField(
+        'Number of references', default=0)
+
+    def __str__(self):
+        return self.name
+
+
 class Comment(models.Model):
     """Model for creating, editing and deleting a comment"""
 
@@ -45,6 +105,12 @@ class Comment(models.Model):
     created = models.DateTimeField(
         'Date added', auto_now_add=True, db_index=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'created', 'id'],
+                         name='posts_comment_post_created_idx'),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -69,3 +135,26 @@ class Follow(models.Model):
     def clean(self):
         if self.user == self.following:
             raise ValidationError("You can't subscribe to yourself")
+
+
+class FeedEntry(models.Model):
+    """Post fanned out to the home feed of a follower of its author"""
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='feed_entries')
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='feed_entries')
+    pub_date = models.DateTimeField('Publication date')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_feed_entry')
+        ]
+        indexes = [
+            models.Index(fields=['user', 'pub_date', 'post'],
+                         name='posts_feed_user_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} <- {self.post_id}'
@@ -0,0 +1,39 @@
+"""Rendering of image variants, run in the worker processes of
+`posts.images`.
+
+The workers are spawned rather than forked, so this module only imports
+Pillow: it is imported without Django being set up.
+"""
+import io
+
+from PIL import Image, ImageOps
+
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+def render_variants(path, variants):
+    """Render `variants` of the image at `path`.
+
+    Returns a dict of variant name to `(extension, content)`; formats this
+    Pillow build cannot encode are skipped.
+    """
+    Image.init()
+    rendered = {}
+    with Image.open(path) as original:
+        original = ImageOps.exif_transpose(original)
+        for name, options in variants.items():
+            image_format = options['format'].upper()
+            if image_format not in Image.SAVE:
+                continue
+            image = original.copy()
+            image.thumbnail(tuple(options['size']), Image.LANCZOS)
+            if image_format == 'JPEG' and image.mode != 'RGB':
+                image = image.convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, image_format,
+                       quality=options.get('quality', 80))
+            rendered[name] = (
+                EXTENSIONS.get(image_format, image_format.lower()),
+                buffer.getvalue(),
+            )
+    return rendered
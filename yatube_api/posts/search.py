@@ -0,0 +1,126 @@
+"""Full-text search over posts.
+
+On SQLite an external content FTS5 table, `posts_post_fts`, indexes
+`posts_post.text` and triggers keep it in sync with every insert, update
+and delete, bulk ones included. On PostgreSQL a GIN index over the
+`to_tsvector('simple', text)` expression serves the same queries. Other
+backends fall back to a case-insensitive substring match.
+"""
+import re
+
+from django.db import connections
+
+FTS_TABLE = 'posts_post_fts'
+PG_INDEX = 'posts_post_text_search_idx'
+PG_VECTOR = "to_tsvector('simple', posts_post.text)"
+
+SQLITE_TRIGGERS = {
+    'posts_post_fts_insert': (
+        'AFTER INSERT ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); '
+        'END'
+    ),
+    'posts_post_fts_delete': (
+        'AFTER DELETE ON posts_post BEGIN '
+        "INSERT INTO posts_post_fts(posts_post_fts, rowid, text) "
+        "VALUES ('delete', old.id, old.text); "
+        'END'
+    ),
+    'posts_post_fts_update': (
+        'AFTER UPDATE OF text ON posts_post BEGIN '
+        "INSERT INTO posts_post_fts(posts_post_fts, rowid, text) "
+        "VALUES ('delete', old.id, old.text); "
+        'INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); '
+        'END'
+    ),
+}
+
+
+def install_index(connection):
+    """Create the search index of `connection` if it is missing.
+
+    SQLite drops triggers whenever a migration rebuilds `posts_post`, so
+    this also runs after every `migrate` and rebuilds the index when it
+    had to restore a trigger.
+    """
+    if 'posts_post' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING '
+                f"fts5(text, content='posts_post', content_rowid='id')"
+            )
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = set(SQLITE_TRIGGERS) - existing
+            for name in sorted(missing):
+                cursor.execute(
+                    f'CREATE TRIGGER {name} {SQLITE_TRIGGERS[name]}')
+            if missing:
+                rebuild_index(connection)
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {PG_INDEX} ON posts_post '
+                f"USING GIN (to_tsvector('simple', text))"
+            )
+
+
+def uninstall_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {PG_INDEX}')
+
+
+def rebuild_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f'REINDEX INDEX {PG_INDEX}')
+
+
+def get_terms(text):
+    return re.findall(r'\w+', text)
+
+
+def search_posts(queryset, text):
+    """Filter `queryset` to posts matching `text`, best matches first."""
+    terms = get_terms(text)
+    if not terms:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        match = ' '.join('"{}"'.format(term) for term in terms)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = posts_post.id',
+                   f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'{FTS_TABLE}.rank'},
+            order_by=['search_rank', '-id'],
+        )
+    if vendor == 'postgresql':
+        query = "plainto_tsquery('simple', %s)"
+        text = ' '.join(terms)
+        return queryset.extra(
+            where=[f'{PG_VECTOR} @@ {query}'],
+            params=[text],
+            select={'search_rank': f'ts_rank({PG_VECTOR}, {query})'},
+            select_params=[text],
+            order_by=['-search_rank', '-id'],
+        )
+    for term in terms:
+        queryset = queryset.filter(text__icontains=term)
+    return queryset
+
+
+def sync_index(sender, using, **kwargs):
+    """Restore the search index after `migrate`."""
+    install_index(connections[using])
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import follow_graph
+from .models import Follow, Profile, User
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, update_fields=None,
+                   **kwargs):
+    if raw:
+        return
+    username_key = Profile.get_username_key(instance.username)
+    if created:
+        Profile.objects.create(user=instance, username_key=username_key)
+    elif update_fields is None or 'username' in update_fields:
+        Profile.objects.filter(user=instance).exclude(
+            username_key=username_key).update(username_key=username_key)
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def invalidate_follow_graph(sender, instance, **kwargs):
+    follow_graph.invalidate(instance.user_id)
@@ -0,0 +1,125 @@
+"""Content-addressed storage of uploaded files.
+
+Every file is stored under the SHA-256 of its content, sharded by the
+first two pairs of hex digits, e.g. `posts/3a/7f/3a7f...e1.jpg`. The hash
+is computed while the upload is streamed to a temporary file next to the
+final location; a file whose content is already stored is dropped without
+writing it again, so re-uploads of the same image share one blob.
+
+A blob may be shared by several rows, so every save counts a reference to
+it in `StoredFile`, within the transaction of the caller. Callers hand
+their names back with `release`; a blob is deleted once the last
+reference is gone. The reference is taken before the blob is looked up,
+so a concurrent release either sees it and keeps the blob, or deletes the
+blob first and the save writes it again.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+from collections import Counter
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils.deconstruct import deconstructible
+
+
+def get_stored_files():
+    # posts.models imports this module for the storage of Post.image.
+    from .models import StoredFile
+    return StoredFile.objects
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage naming files after the hash of their content."""
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content is hashed.
+        return name
+
+    def get_hashed_name(self, name, digest):
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            directory, digest[:2], digest[2:4], digest + extension)
+
+    def make_directory(self, directory):
+        if self.directory_permissions_mode is None:
+            os.makedirs(directory, exist_ok=True)
+            return
+        # os.makedirs() does not apply the mode to intermediate directories.
+        old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+        try:
+            os.makedirs(directory, self.directory_permissions_mode,
+                        exist_ok=True)
+        finally:
+            os.umask(old_umask)
+
+    def _save(self, name, content):
+        self.make_directory(self.location)
+        digest = hashlib.sha256()
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.location, prefix='.upload-')
+        try:
+            with os.fdopen(descriptor, 'wb') as temporary:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temporary.write(chunk)
+            name = self.get_hashed_name(name, digest.hexdigest())
+            full_path = self.path(name)
+            self.acquire(name)
+            if os.path.exists(full_path):
+                return name
+            self.make_directory(os.path.dirname(full_path))
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary_path, self.file_permissions_mode)
+            os.replace(temporary_path, full_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return name
+
+    def acquire(self, name):
+        """Count a new reference to `name`."""
+        files = get_stored_files().filter(name=name)
+        if files.update(references=F('references') + 1):
+            return
+        try:
+            with transaction.atomic():
+                get_stored_files().create(name=name, references=1)
+        except IntegrityError:
+            # Created by a concurrent save in the meantime.
+            files.update(references=F('references') + 1)
+
+    def release(self, names):
+        """Drop one reference per item of `names`.
+
+        Files left without references are deleted once the current
+        transaction is committed.
+        """
+        names = Counter(names)
+        for name, count in names.items():
+            get_stored_files().filter(name=name).update(references=Case(
+                When(references__gt=count, then=F('references') - count),
+                default=Value(0),
+            ))
+        if names:
+            transaction.on_commit(
+                lambda: self.delete_unreferenced(list(names)))
+
+    def delete_unreferenced(self, names):
+        for name in names:
+            with transaction.atomic():
+                # Deleting the row locks it until the blob is gone, so a
+                # concurrent save waits and then writes the blob again.
+                deleted, _ = get_stored_files().filter(
+                    name=name, references=0).delete()
+                if deleted:
+                    self.delete(name)
+
+
+post_images = ContentAddressedStorage()
@@ -1,7 +1,15 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.wsgi import WsgiToAsgi
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+django.setup()
 
-application = get_asgi_application()
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+
+from api.asgi import ReadPathApplication  # noqa: E402
+
+# Django 2.2 has no ASGI handler: the async read path serves the hottest
+# read-only endpoints and hands everything else to the WSGI application.
+application = ReadPathApplication(WsgiToAsgi(get_wsgi_application()))
@@ -0,0 +1,192 @@
+"""In-process pool of database connections.
+
+Database backends that mix in `PooledDatabaseWrapperMixin` take their
+connections from a pool shared by all threads of the process and hand
+them back when Django closes them, e.g. at the end of every request with
+`CONN_MAX_AGE = 0`. The pool is configured with the `POOL` entry of the
+database settings:
+
+    'POOL': {
+        'MAX_SIZE': 10,         # open connections, idle or in use
+        'TIMEOUT': 10,          # seconds to wait for a free connection
+        'MAX_IDLE_TIME': 300,   # close connections idle for longer
+        'CHECK_AFTER': 5,       # ping connections idle for longer
+    }
+
+Checkouts are recorded in `api.instrumentation.pools`.
+"""
+import functools
+import threading
+import time
+
+from django.db import OperationalError
+
+from api.instrumentation import pools as metrics
+
+DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10,
+    'MAX_IDLE_TIME': 300,
+    'CHECK_AFTER': 5,
+}
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def ping(connection):
+    """Whether a raw DB-API connection answers a trivial query."""
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+            cursor.fetchall()
+        finally:
+            cursor.close()
+    except Exception:
+        return False
+    return True
+
+
+class ConnectionPool:
+    """Thread-safe pool of raw DB-API connections of one database."""
+
+    def __init__(self, alias, options=None):
+        options = {**DEFAULTS, **(options or {})}
+        self.alias = alias
+        self.max_size = options['MAX_SIZE']
+        self.timeout = options['TIMEOUT']
+        self.max_idle_time = options['MAX_IDLE_TIME']
+        self.check_after = options['CHECK_AFTER']
+        self.condition = threading.Condition()
+        self.idle = []
+        self.size = 0
+
+    @property
+    def in_use(self):
+        return self.size - len(self.idle)
+
+    def take_idle(self):
+        """Pop the most recently returned connection that is not stale."""
+        now = time.monotonic()
+        while self.idle:
+            connection, returned_at = self.idle.pop()
+            if now - returned_at <= self.max_idle_time:
+                return connection, now - returned_at
+            close_quietly(connection)
+            self.size -= 1
+        return None, None
+
+    def acquire(self, connect):
+        """Return an idle connection, or one made by `connect()`.
+
+        Waits up to `TIMEOUT` seconds for a connection to be released
+        when the pool is full; idle connections failing a ping are
+        replaced.
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self.condition:
+                while True:
+                    connection, idle_for = self.take_idle()
+                    if connection is not None or self.size < self.max_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise OperationalError(
+                            f'No free connection in the pool of '
+                            f'{self.alias!r} after {self.timeout} seconds.')
+                    self.condition.wait(remaining)
+                if connection is None:
+                    self.size += 1
+                in_use = self.in_use
+            if connection is None or idle_for <= self.check_after or ping(
+                    connection):
+                break
+            self.discard(connection)
+        wait_ms = (time.perf_counter() - start) * 1000
+        connect_ms = None
+        if connection is None:
+            start = time.perf_counter()
+            try:
+                connection = connect()
+            except Exception:
+                with self.condition:
+                    self.size -= 1
+                    self.condition.notify()
+                raise
+            connect_ms = (time.perf_counter() - start) * 1000
+        metrics.record(self.alias, {
+            'wait_ms': wait_ms,
+            'connect_ms': connect_ms,
+            'in_use': in_use,
+        })
+        return connection
+
+    def release(self, connection):
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection):
+        close_quietly(connection)
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def clear(self):
+        """Close every idle connection."""
+        with self.condition:
+            for connection, _ in self.idle:
+                close_quietly(connection)
+            self.size -= len(self.idle)
+            self.idle.clear()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options=None):
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(alias, options)
+        return _pools[alias]
+
+
+class PooledDatabaseWrapperMixin:
+    """Takes connections from the pool and returns them on close.
+
+    A connection closed inside an atomic block, or after an error that
+    left it unusable, is closed for real instead.
+    """
+
+    def get_pool(self):
+        return get_pool(self.alias, self.settings_dict.get('POOL'))
+
+    def get_new_connection(self, conn_params):
+        return self.get_pool().acquire(
+            functools.partial(super().get_new_connection, conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = self.get_pool()
+        if self.in_atomic_block:
+            pool.discard(self.connection)
+            return
+        try:
+            with self.wrap_database_errors:
+                self.connection.rollback()
+        except Exception:
+            pool.discard(self.connection)
+            return
+        if self.errors_occurred and not ping(self.connection):
+            pool.discard(self.connection)
+            return
+        pool.release(self.connection)
@@ -18,8 +18,8 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    'api',
-    'posts',
+    'api.apps.ApiConfig',
+    'posts.apps.PostsConfig',
     'djoser',
 ]
 
@@ -60,6 +60,12 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -89,12 +95,31 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+    # MessagePack and CBOR are served to clients that ask for them in the
+    # Accept header and read from request bodies of that Content-Type.
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.MessagePackRenderer',
+        'api.renderers.CBORRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'api.parsers.MessagePackParser',
+        'api.parsers.CBORParser',
     ],
 }
 
@@ -102,3 +127,72 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# Authors with at least this many followers are merged into home feeds on
+# read instead of being fanned out to every follower on write.
+FEED_FANOUT_LIMIT = 1000
+
+# Number of recent posts copied into a feed when following an author.
+FEED_BACKFILL_SIZE = 100
+
+# Cache alias and lifetime (seconds) of cached API responses.
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 300
+
+# Lifetime (seconds) of the cached group catalog, which is invalidated
+# whenever a group or the posts of a group change. Only used with a cache
+# shared by all processes; API_CACHE_TIMEOUT applies otherwise.
+API_GROUP_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Largest JSON array accepted by the bulk create of posts and comments.
+API_BULK_MAX_BATCH_SIZE = 1000
+
+# Serialize post and comment list pages straight from .values() rows.
+API_FAST_LIST_SERIALIZERS = False
+
+# In-process cache of verified access tokens and their users: number of
+# entries and lifetime in seconds (capped by the token expiry).
+API_AUTH_CACHE_SIZE = 1024
+API_AUTH_CACHE_TTL = 60
+
+# Per-request query and timing instrumentation, reported in the
+# Server-Timing header and at /api/v1/metrics/ (admin only).
+API_INSTRUMENTATION = DEBUG
+
+# Follow graph adjacency: cache alias and lifetime (seconds) of the shared
+# copies, and number of users kept in each process and for how long.
+FOLLOW_GRAPH_CACHE_ALIAS = 'default'
+FOLLOW_GRAPH_CACHE_TIMEOUT = 3600
+FOLLOW_GRAPH_LOCAL_SIZE = 10000
+FOLLOW_GRAPH_LOCAL_TTL = 5
+
+# Read replicas of `default` (aliases of DATABASES) used by safe API
+# requests, round-robin among the healthy ones. Replicas are health checked
+# at most every DATABASE_REPLICA_CHECK_SECONDS; one failing its check or a
+# read is retried after DATABASE_REPLICA_RETRY_SECONDS. Users read from
+# `default` for DATABASE_REPLICA_PIN_SECONDS after they write, which needs
+# a cache shared by all processes as API_CACHE_ALIAS. To try it locally, add a copy of db.sqlite3 as a second SQLite database:
+#   DATABASES['replica'] = {
+#       'ENGINE': 'django.db.backends.sqlite3',
+#       'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+#   }
+#   DATABASE_REPLICAS = ['replica']
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_CHECK_SECONDS = 10
+DATABASE_REPLICA_RETRY_SECONDS = 30
+DATABASE_REPLICA_PIN_SECONDS = 5
+
+# Resized variants rendered for post images by a pool of
+# POST_IMAGE_WORKERS processes; POST_IMAGE_PROCESSING_SYNC renders them in
+# the request thread instead. Formats Pillow cannot encode are skipped.
+POST_IMAGE_VARIANTS = {
+    'thumbnail': {'size': (320, 320), 'format': 'JPEG'},
+    'thumbnail_webp': {'size': (320, 320), 'format': 'WEBP'},
+    'medium_webp': {'size': (1280, 1280), 'format': 'WEBP'},
+}
+POST_IMAGE_WORKERS = 2
+POST_IMAGE_PROCESSING_SYNC = False
+
+if API_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, 'api.middleware.InstrumentationMiddleware')
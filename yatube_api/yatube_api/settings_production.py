@@ -0,0 +1,73 @@
+"""Settings for production deployments.
+
+Run with DJANGO_SETTINGS_MODULE=yatube_api.settings_production. Everything
+not set here comes from `settings`; deployment specifics are read from the
+environment.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, MIDDLEWARE
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+# Connections come from an in-process pool (see yatube_api.backends.pool)
+# and go back to it at the end of every request, hence CONN_MAX_AGE = 0.
+# DB_ENGINE is `postgresql` (requires psycopg2) or `sqlite3`.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3')
+
+DATABASES = {
+    'default': {
+        'ENGINE': f'yatube_api.backends.{DB_ENGINE}',
+        'NAME': os.environ.get(
+            'DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', ''),
+        'PORT': os.environ.get('DB_PORT', ''),
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'MAX_IDLE_TIME': 300,
+            'CHECK_AFTER': 5,
+        },
+    }
+}
+
+# Cached responses, cache tag versions, replica pins and the follow graph
+# must be seen by every worker process. CACHE_LOCATION lists memcached
+# servers (requires python-memcached); without it the cache lives in a
+# table of `default`, created by `manage.py createcachetable`.
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION')
+
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': CACHE_LOCATION.split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'api_cache',
+        }
+    }
+
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
+
+# The base settings enable the instrumentation because DEBUG is on there.
+API_INSTRUMENTATION = os.environ.get('API_INSTRUMENTATION') == '1'
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware != 'api.middleware.InstrumentationMiddleware'
+]
+if API_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, 'api.middleware.InstrumentationMiddleware')